@@ -1,17 +1,21 @@
-from flask import Flask
+from flask import Flask, has_request_context, request
 from flask_cors import CORS
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
 from app.config import Config
 from app.utils.logger import setup_logger
+from app.utils.read_router import ReadRouter
 
 # Logger global
 logger = setup_logger('app')
 
-# Engine de SQLAlchemy (global)
+# Engine de SQLAlchemy (global): primario, para escrituras
 engine = None
 SessionLocal = None
 
+# Réplicas de lectura (si Config.SQLALCHEMY_REPLICA_URIS está vacío, lee del primario)
+read_router = None
+
 def create_app():
     """Factory para crear la aplicación Flask"""
     app = Flask(__name__)
@@ -37,26 +41,49 @@ def create_app():
                 'indicators': '/api/indicators',
                 'indicator_detail': '/api/indicators/<code>',
                 'indicator_history': '/api/indicators/<code>/history',
-                'latest': '/api/stats/latest'
+                'history_batch': '/api/history?codes=<code>,<code>',
+                'matrix': '/api/matrix?codes=<code>,<code>&from=&to=',
+                'latest': '/api/stats/latest',
+                'stream': '/api/stream',
+                'health': '/api/health',
+                'ready': '/api/ready'
             }
         }
     
     logger.info("✓ Aplicación Flask inicializada")
     return app
 
+def _create_engine(url):
+    return create_engine(
+        url,
+        echo=Config.DEBUG,
+        pool_pre_ping=True,
+        pool_size=Config.DB_POOL_SIZE,
+        max_overflow=Config.DB_MAX_OVERFLOW,
+        pool_recycle=Config.DB_POOL_RECYCLE
+    )
+
 def init_db():
     """Inicializar conexión a la base de datos"""
-    global engine, SessionLocal
+    global engine, SessionLocal, read_router
     
     try:
-        engine = create_engine(
-            Config.SQLALCHEMY_DATABASE_URI,
-            echo=Config.DEBUG,
-            pool_pre_ping=True
-        )
+        engine = _create_engine(Config.SQLALCHEMY_DATABASE_URI)
         
         SessionLocal = sessionmaker(bind=engine)
         
+        # Las réplicas no se prueban aquí: una réplica caída no debe
+        # impedir el arranque (el router la omite y lee del primario)
+        read_router = ReadRouter(
+            engine,
+            [_create_engine(url) for url in Config.SQLALCHEMY_REPLICA_URIS],
+            health_check_seconds=Config.REPLICA_HEALTH_CHECK_SECONDS,
+            retry_seconds=Config.REPLICA_RETRY_SECONDS,
+            max_lag_seconds=Config.REPLICA_MAX_LAG_SECONDS
+        )
+        if Config.SQLALCHEMY_REPLICA_URIS:
+            logger.info(f"✓ {len(Config.SQLALCHEMY_REPLICA_URIS)} réplica(s) de lectura configurada(s)")
+        
         # Probar conexión
         with engine.connect() as conn:
             logger.info("✓ Conexión a PostgreSQL exitosa")
@@ -65,10 +92,56 @@ def init_db():
         logger.error(f"✗ Error conectando a PostgreSQL: {e}")
         raise
 
+def dispose_engine():
+    """
+    Descartar el pool heredado tras un fork (gunicorn con preload_app).
+    
+    Las conexiones abiertas por el proceso master no deben compartirse
+    entre workers: close=False las abandona sin cerrarlas, para no
+    cortar los sockets que el master (u otro worker) sigue usando.
+    """
+    if engine is not None:
+        engine.dispose(close=False)
+    if read_router is not None:
+        read_router.dispose()
+
 def get_db():
     """Obtener sesión de base de datos"""
     db = SessionLocal()
     try:
         return db
     finally:
-        pass
\ No newline at end of file
+        pass
+
+def get_read_db():
+    """
+    Obtener sesión de solo lectura (rutas GET): una réplica en
+    round-robin, o el primario si no hay réplicas sanas.
+    
+    Read-your-writes: el cliente puede forzar el primario con
+    ?consistency=primary o el header 'X-Read-Consistency: primary'.
+    """
+    bind = engine
+    if read_router is not None and read_router.replicas:
+        # El pin de read-your-writes llega por LISTEN: el listener debe
+        # correr en este worker aunque no tenga clientes SSE
+        from app.services.notifier import broadcaster
+        broadcaster.ensure_listener()
+        if not wants_primary_read():
+            bind = read_router.pick()
+    return SessionLocal(bind=bind)
+
+def wants_primary_read():
+    """True si la petición actual pide leer del primario (datos recién cargados)."""
+    if not has_request_context():
+        return False
+    return (request.args.get('consistency') == 'primary'
+            or request.headers.get('X-Read-Consistency') == 'primary')
+
+def pin_reads_to_primary(seconds=None):
+    """
+    Leer del primario mientras las réplicas se ponen al día. Lo llama el
+    listener de cada worker al recibir el NOTIFY de una carga del ETL.
+    """
+    if read_router is not None:
+        read_router.pin_primary(seconds or Config.READ_YOUR_WRITES_SECONDS)
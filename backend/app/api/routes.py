@@ -1,48 +1,77 @@
-from flask import Blueprint, jsonify, request
+from flask import Blueprint, Response, jsonify, request
 from sqlalchemy import desc, func, text  # <-- 'text' es necesario
-from app import get_db
+from app import get_db, get_read_db, wants_primary_read
+from app.config import Config
 from app.models import Indicator, IndicatorValue
+from app.services.payloads import (
+    DEFAULT_HISTORY_DAYS, DEFAULT_HISTORY_LIMIT,
+    indicators_payload, history_payload, history_batch_payload, latest_stats_payload
+)
+from app.services.analytics import (
+    BASES, DEFAULT_MATRIX_DAYS, FILL_METHODS, matrix_cache, matrix_payload
+)
+from app.services.notifier import broadcaster
+from app.services.snapshots import (
+    HISTORY_BATCH_DAYS, KEY_INDICATORS, KEY_LATEST, history_batch_key, get_snapshot_store, render_json
+)
 from app.utils.logger import setup_logger
-from datetime import datetime, timedelta
+from datetime import date, datetime, timedelta
+from queue import Empty
+import json
 
 api_bp = Blueprint('api', __name__)
 logger = setup_logger('api')
 
+def serve_snapshot(key):
+    """
+    Responder con un snapshot precomprimido por el ETL, si existe,
+    está vigente y el cliente acepta alguna de sus codificaciones.
+    Retorna None para que la ruta use el camino normal (query a la DB).
+    """
+    # ?consistency=primary: el snapshot puede ser anterior a la última carga
+    if wants_primary_read():
+        return None
+    
+    store = get_snapshot_store()
+    for encoding in ('br', 'gzip'):
+        # Calidad > 0: 'gzip;q=0' significa que el cliente la rechaza
+        if request.accept_encodings[encoding] <= 0:
+            continue
+        body = store.get(key, encoding)
+        if body is not None:
+            response = Response(body, status=200, mimetype='application/json')
+            response.headers['Content-Encoding'] = encoding
+            response.headers['Vary'] = 'Accept-Encoding'
+            response.headers['X-Snapshot-Generated-At'] = store.generated_at.isoformat()
+            return response
+    return None
+
+def parse_since(value):
+    """
+    Interpretar ?since=: una fecha ('2025-11-05') o la 'version'
+    devuelta por una respuesta anterior (timestamp ISO).
+    Lanza ValueError si el formato no es válido.
+    """
+    if not value:
+        return None
+    return datetime.fromisoformat(value)
+
+def parse_date(value):
+    """Interpretar un parámetro de fecha (YYYY-MM-DD). Lanza ValueError si no es válido."""
+    if not value:
+        return None
+    return date.fromisoformat(value)
+
 @api_bp.route('/indicators', methods=['GET'])
 def get_indicators():
     """Obtener todos los indicadores con su último valor"""
+    snapshot = serve_snapshot(KEY_INDICATORS)
+    if snapshot is not None:
+        return snapshot
+    
     try:
-        db = get_db()
-        
-        # Query para obtener indicadores con su último valor
-        indicators = db.query(
-            Indicator.id,
-            Indicator.code,
-            Indicator.name,
-            Indicator.unit,
-            IndicatorValue.value,
-            IndicatorValue.date
-        ).outerjoin(
-            IndicatorValue,
-            Indicator.id == IndicatorValue.indicator_id
-        ).distinct(
-            Indicator.id
-        ).order_by(
-            Indicator.id,
-            desc(IndicatorValue.date)
-        ).all()
-        
-        result = []
-        for ind in indicators:
-            result.append({
-                'id': ind.id,
-                'code': ind.code,
-                'name': ind.name,
-                'unit': ind.unit,
-                'latest_value': float(ind.value) if ind.value else None,
-                'latest_date': ind.date.isoformat() if ind.date else None
-            })
-        
+        db = get_read_db()
+        result = indicators_payload(db)
         db.close()
         return jsonify(result), 200
         
@@ -54,7 +83,7 @@ def get_indicators():
 def get_indicator_by_code(code):
     """Obtener un indicador específico por código"""
     try:
-        db = get_db()
+        db = get_read_db()
         
         indicator = db.query(Indicator).filter(Indicator.code == code).first()
         
@@ -86,13 +115,33 @@ def get_indicator_by_code(code):
 
 @api_bp.route('/indicators/<code>/history', methods=['GET'])
 def get_indicator_history(code):
-    """Obtener histórico de un indicador"""
+    """
+    Obtener histórico de un indicador (más reciente primero).
+    
+    Rango: ?days= relativo a hoy, o ?from=/?to= explícitos.
+    Paginación: ?limit= y ?cursor= (el 'next_cursor' de la página anterior).
+    """
+    # Parámetros opcionales
+    days = request.args.get('days', default=DEFAULT_HISTORY_DAYS, type=int)
+    cursor = request.args.get('cursor')
     try:
-        db = get_db()
-        
-        # Parámetros opcionales
-        days = request.args.get('days', default=30, type=int)
-        limit = request.args.get('limit', default=100, type=int)
+        since = parse_since(request.args.get('since'))
+    except ValueError:
+        return jsonify({'error': "Parámetro 'since' inválido (use una fecha o la 'version' recibida)"}), 400
+    try:
+        date_from = parse_date(request.args.get('from'))
+        date_to = parse_date(request.args.get('to'))
+    except ValueError:
+        return jsonify({'error': "Parámetros 'from'/'to' inválidos (formato YYYY-MM-DD)"}), 400
+    
+    # Un delta (?since=) no se trunca salvo que se pida un límite explícito
+    default_limit = DEFAULT_HISTORY_LIMIT if since is None else None
+    limit = request.args.get('limit', default=default_limit, type=int)
+    if limit is not None and limit < 1:
+        return jsonify({'error': "El parámetro 'limit' debe ser mayor que 0"}), 400
+    
+    try:
+        db = get_read_db()
         
         # Buscar indicador
         indicator = db.query(Indicator).filter(Indicator.code == code).first()
@@ -101,85 +150,137 @@ def get_indicator_history(code):
             db.close()
             return jsonify({'error': 'Indicador no encontrado'}), 404
         
-        # Calcular fecha desde
-        date_from = datetime.now().date() - timedelta(days=days)
+        try:
+            result = history_payload(
+                db, indicator, days, limit, since,
+                date_from=date_from, date_to=date_to, cursor=cursor
+            )
+        except ValueError as e:
+            db.close()
+            return jsonify({'error': str(e)}), 400
         
-        # Query de valores
-        values = db.query(IndicatorValue)\
-            .filter(
-                IndicatorValue.indicator_id == indicator.id,
-                IndicatorValue.date >= date_from
-            )\
-            .order_by(desc(IndicatorValue.date))\
-            .limit(limit)\
-            .all()
+        db.close()
+        return jsonify(result), 200
         
-        result = {
-            'indicator': {
-                'code': indicator.code,
-                'name': indicator.name,
-                'unit': indicator.unit
-            },
-            'values': [
-                {
-                    'value': float(v.value),
-                    'date': v.date.isoformat()
-                }
-                for v in values
-            ],
-            'count': len(values)
-        }
+    except Exception as e:
+        logger.error(f"Error en get_indicator_history: {e}")
+        return jsonify({'error': str(e)}), 500
+
+@api_bp.route('/history', methods=['GET'])
+def get_history_batch():
+    """
+    Obtener el histórico de varios indicadores en una sola petición.
+    Ej: /api/history?codes=dolar,uf&days=365&since=2025-11-05T10:00:00
+    """
+    codes = [c.strip() for c in request.args.get('codes', '').split(',') if c.strip()]
+    days = request.args.get('days', default=DEFAULT_HISTORY_DAYS, type=int)
+    try:
+        since = parse_since(request.args.get('since'))
+    except ValueError:
+        return jsonify({'error': "Parámetro 'since' inválido (use una fecha o la 'version' recibida)"}), 400
+    
+    if not codes:
+        return jsonify({'error': "Debe indicar al menos un código en 'codes'"}), 400
+    
+    # La sincronización inicial del dashboard (sin ?since=) se sirve desde snapshot
+    if days == HISTORY_BATCH_DAYS and since is None:
+        snapshot = serve_snapshot(history_batch_key(codes, days))
+        if snapshot is not None:
+            return snapshot
+    
+    try:
+        db = get_read_db()
+        
+        indicators = db.query(Indicator).filter(Indicator.code.in_(codes)).all()
+        
+        if not indicators:
+            db.close()
+            return jsonify({'error': 'Indicador no encontrado'}), 404
+        
+        result = history_batch_payload(db, indicators, days, since)
+        found = {indicator.code for indicator in indicators}
+        result['missing'] = [c for c in codes if c not in found]
         
         db.close()
         return jsonify(result), 200
         
     except Exception as e:
-        logger.error(f"Error en get_indicator_history: {e}")
+        logger.error(f"Error en get_history_batch: {e}")
         return jsonify({'error': str(e)}), 500
 
-@api_bp.route('/stats/latest', methods=['GET'])
-def get_latest_stats():
-    """Obtener estadísticas de los últimos valores"""
+@api_bp.route('/matrix', methods=['GET'])
+def get_matrix():
+    """
+    Valores de varios indicadores alineados por fecha, con su correlación
+    y covarianza (del período completo y, con ?window=, móviles).
+    Ej: /api/matrix?codes=dolar,euro,bitcoin&from=2025-01-01&to=2025-06-30&fill=ffill
+    """
+    codes = list(dict.fromkeys(c.strip() for c in request.args.get('codes', '').split(',') if c.strip()))
+    fill = request.args.get('fill', default='ffill')
+    basis = request.args.get('basis', default='returns')
+    window = request.args.get('window', type=int)
     try:
-        db = get_db()
+        date_to = parse_date(request.args.get('to')) or datetime.now().date()
+        date_from = parse_date(request.args.get('from')) or date_to - timedelta(days=DEFAULT_MATRIX_DAYS)
+    except (ValueError, OverflowError):
+        return jsonify({'error': "Parámetros 'from'/'to' inválidos (formato YYYY-MM-DD)"}), 400
+    
+    if not codes:
+        return jsonify({'error': "Debe indicar al menos un código en 'codes'"}), 400
+    if len(codes) > Config.MATRIX_MAX_CODES:
+        return jsonify({'error': f"Máximo {Config.MATRIX_MAX_CODES} códigos por consulta"}), 400
+    if date_from > date_to:
+        return jsonify({'error': "'from' debe ser anterior o igual a 'to'"}), 400
+    if (date_to - date_from).days > Config.MATRIX_MAX_DAYS:
+        return jsonify({'error': f"El rango 'from'..'to' no puede superar {Config.MATRIX_MAX_DAYS} días"}), 400
+    if fill not in FILL_METHODS:
+        return jsonify({'error': f"Parámetro 'fill' inválido (opciones: {', '.join(FILL_METHODS)})"}), 400
+    if basis not in BASES:
+        return jsonify({'error': f"Parámetro 'basis' inválido (opciones: {', '.join(BASES)})"}), 400
+    if window is not None and not 2 <= window <= Config.MATRIX_MAX_WINDOW:
+        return jsonify({'error': f"El parámetro 'window' debe estar entre 2 y {Config.MATRIX_MAX_WINDOW}"}), 400
+    if window is not None and len(codes) > Config.MATRIX_MAX_ROLLING_CODES:
+        return jsonify({'error': f"Con 'window', máximo {Config.MATRIX_MAX_ROLLING_CODES} códigos por consulta"}), 400
+    
+    cache_key = (tuple(codes), date_from, date_to, fill, basis, window)
+    body = matrix_cache.get(cache_key)
+    if body is not None:
+        return Response(body, status=200, mimetype='application/json')
+    
+    try:
+        db = get_read_db()
         
-        # Subquery para obtener el último valor de cada indicador
-        subq = db.query(
-            IndicatorValue.indicator_id,
-            func.max(IndicatorValue.date).label('max_date')
-        ).group_by(IndicatorValue.indicator_id).subquery()
-        
-        # Query principal
-        latest = db.query(
-            Indicator.code,
-            Indicator.name,
-            Indicator.unit,
-            IndicatorValue.value,
-            IndicatorValue.date
-        ).join(
-            IndicatorValue,
-            Indicator.id == IndicatorValue.indicator_id
-        ).join(
-            subq,
-            (IndicatorValue.indicator_id == subq.c.indicator_id) &
-            (IndicatorValue.date == subq.c.max_date)
-        ).all()
+        found = {i.code: i for i in db.query(Indicator).filter(Indicator.code.in_(codes)).all()}
         
-        result = {
-            'timestamp': datetime.now().isoformat(),
-            'indicators': [
-                {
-                    'code': item.code,
-                    'name': item.name,
-                    'unit': item.unit,
-                    'value': float(item.value),
-                    'date': item.date.isoformat()
-                }
-                for item in latest
-            ],
-            'count': len(latest)
-        }
+        if not found:
+            db.close()
+            return jsonify({'error': 'Indicador no encontrado'}), 404
+        
+        # Columnas en el orden pedido
+        indicators = [found[c] for c in codes if c in found]
+        result = matrix_payload(db, indicators, date_from, date_to, fill, basis, window)
+        result['missing'] = [c for c in codes if c not in found]
         
+        db.close()
+        # Se cachea ya serializado: un acierto no vuelve a generar el JSON
+        body = render_json(result)
+        matrix_cache.set(cache_key, body)
+        return Response(body, status=200, mimetype='application/json')
+        
+    except Exception as e:
+        logger.error(f"Error en get_matrix: {e}")
+        return jsonify({'error': str(e)}), 500
+
+@api_bp.route('/stats/latest', methods=['GET'])
+def get_latest_stats():
+    """Obtener estadísticas de los últimos valores"""
+    snapshot = serve_snapshot(KEY_LATEST)
+    if snapshot is not None:
+        return snapshot
+    
+    try:
+        db = get_read_db()
+        result = latest_stats_payload(db)
         db.close()
         return jsonify(result), 200
         
@@ -187,6 +288,58 @@ def get_latest_stats():
         logger.error(f"Error en get_latest_stats: {e}")
         return jsonify({'error': str(e)}), 500
 
+@api_bp.route('/stream', methods=['GET'])
+def stream_updates():
+    """
+    Server-Sent Events con los valores nuevos que carga el ETL.
+    
+    Eventos:
+        value:  {"code": "dolar", "date": "2025-11-05", "value": 945.13}
+        resync: {"codes": [...]}  (carga masiva: pedir el delta con ?since=)
+    """
+    if request.method == 'HEAD':
+        # Flask agrega HEAD a las rutas GET, pero un HEAD nunca lee el cuerpo:
+        # el stream no tiene sentido y solo ocuparía un cupo del worker
+        response = jsonify({'error': 'Use GET para abrir el stream'})
+        response.status_code = 405
+        response.headers['Allow'] = 'GET'
+        return response
+
+    subscriber = broadcaster.subscribe()
+    if subscriber is None:
+        # Worker lleno: rechazar en vez de ocupar el thread de otra ruta.
+        # El frontend reintenta más tarde (posiblemente en otro worker).
+        logger.warning(f"Límite de {Config.STREAM_MAX_CLIENTS} streams alcanzado en este worker.")
+        response = Response(f"retry: {Config.STREAM_BUSY_RETRY_SECONDS * 1000}\n\n",
+                            status=503, mimetype='text/event-stream')
+        response.headers['Retry-After'] = str(Config.STREAM_BUSY_RETRY_SECONDS)
+        return response
+    
+    def generate():
+        yield 'retry: 5000\n\n'
+        while True:
+            try:
+                message = subscriber.get(timeout=Config.STREAM_HEARTBEAT_SECONDS)
+            except Empty:
+                # Comentario SSE: mantiene viva la conexión en proxies
+                yield ': ping\n\n'
+                continue
+            
+            if message.get('type') == 'resync':
+                yield f"event: resync\ndata: {json.dumps({'codes': message['codes']})}\n\n"
+            else:
+                for event in message.get('events', []):
+                    yield f"event: value\ndata: {json.dumps(event)}\n\n"
+    
+    response = Response(generate(), mimetype='text/event-stream', headers={
+        'Cache-Control': 'no-cache',
+        'X-Accel-Buffering': 'no'  # Evitar buffering en nginx
+    })
+    # El servidor WSGI cierra la respuesta al desconectarse el cliente, aunque
+    # el cuerpo nunca se haya leído (a diferencia del finally del generador)
+    response.call_on_close(lambda: broadcaster.unsubscribe(subscriber))
+    return response
+
 @api_bp.route('/health', methods=['GET'])
 def health_check():
     """Health check para verificar que la API está funcionando"""
@@ -209,4 +362,47 @@ def health_check():
             'status': 'unhealthy',
             'error': str(e),
             'timestamp': datetime.now().isoformat()
-        }), 500
\ No newline at end of file
+        }), 500
+
+@api_bp.route('/ready', methods=['GET'])
+def readiness_check():
+    """
+    Readiness check: indica si este worker puede recibir tráfico.
+    
+    A diferencia de /health (liveness), exige que el catálogo de
+    indicadores exista y que el ETL haya cargado al menos un valor.
+    Responde 503 mientras no esté listo.
+    """
+    from app import engine, read_router
+    
+    try:
+        db = get_db()
+        indicators_count = db.query(func.count(Indicator.id)).scalar()
+        has_values = db.query(IndicatorValue.id).first() is not None
+        db.close()
+        
+        ready = indicators_count > 0 and has_values
+        return jsonify({
+            'status': 'ready' if ready else 'not_ready',
+            'indicators': indicators_count,
+            'has_values': has_values,
+            'pool': {
+                'size': engine.pool.size(),
+                'checked_out': engine.pool.checkedout(),
+                'overflow': engine.pool.overflow(),
+                'max_overflow': Config.DB_MAX_OVERFLOW
+            },
+            'replicas': read_router.status(),
+            'streams': {
+                'connected': broadcaster.count(),
+                'max': Config.STREAM_MAX_CLIENTS
+            },
+            'timestamp': datetime.now().isoformat()
+        }), 200 if ready else 503
+    except Exception as e:
+        logger.error(f"Error en readiness_check: {e}")
+        return jsonify({
+            'status': 'not_ready',
+            'error': str(e),
+            'timestamp': datetime.now().isoformat()
+        }), 503
@@ -4,26 +4,68 @@ import os
 # Cargar variables de entorno
 #load_dotenv()
 
+# Base de datos de la aplicación si no se define DB_NAME
+# (las pruebas de carga se niegan a escribir en ella)
+DEFAULT_DB_NAME = 'indicadores_db'
+
 class Config:
     """Configuración de la aplicación"""
     
     # Base de datos
-    DB_HOST = 'localhost'
-    DB_PORT = '5432'
-    DB_NAME = 'indicadores_db'
-    DB_USER = 'postgres'
-    DB_PASSWORD = 'Trevor5198'
+    DB_HOST = os.environ.get('DB_HOST', 'localhost')
+    DB_PORT = os.environ.get('DB_PORT', '5432')
+    DB_NAME = os.environ.get('DB_NAME', DEFAULT_DB_NAME)
+    DB_USER = os.environ.get('DB_USER', 'postgres')
+    DB_PASSWORD = os.environ.get('DB_PASSWORD', 'Trevor5198')
     
     # SQLAlchemy
     SQLALCHEMY_DATABASE_URI = f"postgresql://{DB_USER}:{DB_PASSWORD}@{DB_HOST}:{DB_PORT}/{DB_NAME}"
     SQLALCHEMY_TRACK_MODIFICATIONS = False
     
+    # Réplicas de lectura (opcional): URLs separadas por coma.
+    # Las rutas GET leen de ellas; el ETL/loader siempre escribe en el primario.
+    SQLALCHEMY_REPLICA_URIS = [u.strip() for u in os.environ.get('DB_REPLICA_URLS', '').split(',') if u.strip()]
+    REPLICA_HEALTH_CHECK_SECONDS = 5
+    REPLICA_RETRY_SECONDS = 30          # Tiempo que se omite una réplica caída
+    REPLICA_MAX_LAG_SECONDS = float(os.environ.get('REPLICA_MAX_LAG_SECONDS', 0)) or None
+    READ_YOUR_WRITES_SECONDS = 10       # Lecturas al primario tras una carga en este proceso
+    
+    # Pool de conexiones (por proceso; gunicorn.conf.py lo ajusta a los threads)
+    DB_POOL_SIZE = int(os.environ.get('DB_POOL_SIZE', 5))
+    DB_MAX_OVERFLOW = int(os.environ.get('DB_MAX_OVERFLOW', 2))
+    DB_POOL_RECYCLE = int(os.environ.get('DB_POOL_RECYCLE', 1800))  # segundos
+    
     # Flask
     SECRET_KEY = 'dev-secret-key'
-    DEBUG = True
+    DEBUG = os.environ.get('FLASK_DEBUG', 'True') == 'True'
     
     # APIs externas
-    MINDICADOR_API_URL = 'https://mindicador.cl/api'
+    MINDICADOR_API_URL = os.environ.get('MINDICADOR_API_URL', 'https://mindicador.cl/api')
     
     # Scheduler
     ETL_INTERVAL_HOURS = 24
+    
+    # Snapshots precomprimidos del dashboard (los escribe el ETL, los leen los workers)
+    SNAPSHOT_DIR = os.environ.get('SNAPSHOT_DIR', 'snapshots')
+    
+    # Notificaciones en vivo (PostgreSQL LISTEN/NOTIFY -> /api/stream)
+    NOTIFY_CHANNEL = 'indicator_values'
+    NOTIFY_MAX_EVENTS = 500         # Más cambios que esto en una carga -> evento 'resync'
+    STREAM_HEARTBEAT_SECONDS = 15
+    STREAM_QUEUE_SIZE = 1000        # Mensajes pendientes por cliente SSE
+    # Cada stream ocupa un thread del worker mientras el dashboard está abierto:
+    # más de esto por worker -> 503 (gunicorn.conf.py suma estos threads a GUNICORN_THREADS)
+    STREAM_MAX_CLIENTS = int(os.environ.get('STREAM_MAX_CLIENTS', 50))
+    STREAM_BUSY_RETRY_SECONDS = 30
+    
+    # /api/matrix (correlaciones entre indicadores)
+    MATRIX_MAX_CODES = 10
+    MATRIX_MAX_ROLLING_CODES = 5        # Con ?window=: el payload crece con ventanas x pares
+    MATRIX_MAX_DAYS = 3660              # Rango máximo from..to (~10 años)
+    MATRIX_MAX_WINDOW = 365             # ?window= máximo (filas por ventana móvil)
+    MATRIX_CACHE_TTL_SECONDS = 300      # Los datos cambian una vez al día (ETL)
+    MATRIX_CACHE_MAX_BYTES = 32 * 1024 * 1024  # JSON ya serializado, por proceso
+    
+    # Extractor: 'live' | 'record' (graba las respuestas) | 'replay' (lee las grabadas)
+    EXTRACTOR_MODE = os.environ.get('EXTRACTOR_MODE', 'live')
+    ARCHIVE_DIR = os.environ.get('ARCHIVE_DIR', 'archive')
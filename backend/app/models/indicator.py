@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Numeric, Date, DateTime, ForeignKey
+from sqlalchemy import Column, Integer, String, Numeric, Date, DateTime, ForeignKey, func
 from sqlalchemy.orm import relationship
 from sqlalchemy.ext.declarative import declarative_base
 from datetime import datetime
@@ -41,6 +41,9 @@ class IndicatorValue(Base):
     value = Column(Numeric(15, 4), nullable=False)
     date = Column(Date, nullable=False)
     created_at = Column(DateTime, default=datetime.now)
+    # Lo fija la base de datos: al insertar (DEFAULT NOW()) y, en cada carga,
+    # loader.stamp_changes() con un valor en orden de commit (cursor de ?since=)
+    updated_at = Column(DateTime, server_default=func.now(), nullable=False)
     
     # Relación con indicador
     indicator = relationship('Indicator', back_populates='values')
@@ -55,5 +58,6 @@ class IndicatorValue(Base):
             'indicator_id': self.indicator_id,
             'value': float(self.value),
             'date': self.date.isoformat() if self.date else None,
-            'created_at': self.created_at.isoformat() if self.created_at else None
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'updated_at': self.updated_at.isoformat() if self.updated_at else None
         }
\ No newline at end of file
@@ -0,0 +1,262 @@
+import threading
+import time
+from collections import OrderedDict
+from datetime import date, timedelta
+import numpy as np
+from app.config import Config
+from app.models import IndicatorValue
+
+# Valores por defecto de /api/matrix
+DEFAULT_MATRIX_DAYS = 365
+FILL_METHODS = ('ffill', 'none')
+BASES = ('returns', 'levels')
+
+# Con fill=ffill se leen también estos días previos a 'from', para que
+# la primera fila tenga el último valor conocido (fin de semana, UTM mensual)
+FFILL_LOOKBACK_DAYS = 31
+
+def matrix_payload(db, indicators: list, date_from: date, date_to: date,
+                   fill: str = 'ffill', basis: str = 'returns', window: int = None) -> dict:
+    """
+    Construye la respuesta de /api/matrix: los valores de varios indicadores
+    alineados sobre un eje de fechas común, más su correlación y covarianza.
+
+    Args:
+        indicators: Indicadores ya encontrados (una columna por indicador, en ese orden).
+        date_from, date_to: Rango de fechas (inclusive).
+        fill: 'ffill' = eje de días corridos, arrastrando el último valor
+              (fines de semana, feriados, indicadores mensuales);
+              'none' = solo fechas con algún dato, con null donde falte.
+        basis: 'returns' = estadísticas sobre variaciones diarias (lo usual
+               para comparar series con distinta escala); 'levels' = sobre los valores.
+        window: Si se indica, además correlación/covarianza móviles de
+                `window` observaciones (solo por par de indicadores, ver rolling_pairs).
+    """
+    ids = [indicator.id for indicator in indicators]
+    query_from = date_from
+    if fill == 'ffill':
+        # Sin pasar de date.min (ej. from=0001-01-01)
+        query_from = date_from - timedelta(days=min(FFILL_LOOKBACK_DAYS, (date_from - date.min).days))
+
+    # Una sola query para todas las series
+    rows = db.query(
+        IndicatorValue.indicator_id,
+        IndicatorValue.date,
+        IndicatorValue.value
+    ).filter(
+        IndicatorValue.indicator_id.in_(ids),
+        IndicatorValue.date >= query_from,
+        IndicatorValue.date <= date_to
+    ).all()
+
+    dates, matrix = align(rows, ids, query_from, date_to, fill)
+    if query_from != date_from:
+        # Descartar los días de arrastre
+        skip = (date_from - query_from).days
+        dates, matrix = dates[skip:], matrix[skip:]
+    stats_input = pct_change(matrix) if basis == 'returns' else matrix
+    correlation, covariance, observations = full_period_stats(stats_input)
+
+    result = {
+        'codes': [indicator.code for indicator in indicators],
+        'dates': [d.isoformat() for d in dates],
+        'values': to_list(matrix),
+        'fill': fill,
+        'basis': basis,
+        'from': date_from.isoformat(),
+        'to': date_to.isoformat(),
+        'observations': observations,
+        'correlation': to_list(correlation),
+        'covariance': to_list(covariance),
+        'rolling': None
+    }
+
+    if window:
+        rolling_corr, rolling_cov = rolling_stats(stats_input, window)
+        result['rolling'] = {
+            'window': window,
+            # Cada ventana se fecha con su último día
+            'dates': result['dates'][window - 1:] if rolling_corr.size else [],
+            **rolling_pairs(rolling_corr, rolling_cov, result['codes'])
+        }
+
+    return result
+
+def align(rows: list, ids: list, date_from: date, date_to: date, fill: str = 'ffill'):
+    """
+    Ubicar (indicator_id, date, value) en una matriz fechas x indicadores.
+    Las celdas sin dato quedan en NaN. Retorna (fechas, matriz).
+    """
+    column_of = {indicator_id: i for i, indicator_id in enumerate(ids)}
+    if rows:
+        row_dates = np.array([r.date for r in rows], dtype='datetime64[D]')
+        columns = np.fromiter((column_of[r.indicator_id] for r in rows), dtype=np.intp, count=len(rows))
+        values = np.fromiter((float(r.value) for r in rows), dtype=np.float64, count=len(rows))
+    else:
+        row_dates = np.array([], dtype='datetime64[D]')
+        columns = np.array([], dtype=np.intp)
+        values = np.array([], dtype=np.float64)
+
+    if fill == 'ffill':
+        # Eje de días corridos: la fila es el offset desde date_from
+        axis = np.arange(np.datetime64(date_from, 'D'), np.datetime64(date_to, 'D') + 1)
+        positions = (row_dates - np.datetime64(date_from, 'D')).astype(np.intp)
+        # Filas fuera del rango (un índice negativo daría la vuelta al final)
+        inside = (positions >= 0) & (positions < axis.size)
+        positions, columns, values = positions[inside], columns[inside], values[inside]
+    else:
+        # Eje con las fechas que tienen algún dato
+        axis, positions = np.unique(row_dates, return_inverse=True)
+
+    matrix = np.full((axis.size, len(ids)), np.nan)
+    matrix[positions, columns] = values
+
+    if fill == 'ffill':
+        matrix = forward_fill(matrix)
+
+    return axis.astype(object).tolist(), matrix
+
+def forward_fill(matrix: np.ndarray) -> np.ndarray:
+    """
+    Rellenar cada NaN con el último valor previo de su columna, sin loops:
+    para cada celda se arrastra el índice de la última fila con dato
+    (np.maximum.accumulate) y se indexa con él. Los NaN iniciales se mantienen.
+    """
+    if matrix.size == 0:
+        return matrix
+    rows = np.arange(matrix.shape[0])[:, None]
+    last_valid = np.where(np.isnan(matrix), 0, rows)
+    np.maximum.accumulate(last_valid, axis=0, out=last_valid)
+    return matrix[last_valid, np.arange(matrix.shape[1])]
+
+def pct_change(matrix: np.ndarray) -> np.ndarray:
+    """Variación porcentual entre filas consecutivas (la primera fila queda en NaN)."""
+    changes = np.full(matrix.shape, np.nan)
+    if matrix.shape[0] > 1:
+        with np.errstate(divide='ignore', invalid='ignore'):
+            changes[1:] = matrix[1:] / matrix[:-1] - 1
+        changes[~np.isfinite(changes)] = np.nan
+    return changes
+
+def full_period_stats(matrix: np.ndarray):
+    """
+    Correlación y covarianza de todo el período, usando solo las filas
+    con dato en todas las columnas. Retorna (correlación, covarianza, n° de filas usadas).
+    """
+    columns = matrix.shape[1]
+    complete = matrix[~np.isnan(matrix).any(axis=1)]
+    if complete.shape[0] < 2:
+        empty = np.full((columns, columns), np.nan)
+        return empty, empty, int(complete.shape[0])
+
+    covariance = np.atleast_2d(np.cov(complete, rowvar=False))
+    with np.errstate(divide='ignore', invalid='ignore'):
+        # Una serie constante (varianza 0) deja su fila/columna en NaN
+        std = np.sqrt(np.diag(covariance))
+        correlation = covariance / np.outer(std, std)
+    return correlation, covariance, int(complete.shape[0])
+
+def rolling_stats(matrix: np.ndarray, window: int):
+    """
+    Correlación y covarianza móviles: arrays (ventanas, columnas, columnas).
+    Si una columna tiene algún NaN en la ventana, sus celdas quedan en NaN.
+
+    Se calculan con sumas acumuladas (de x, de x·y y de filas válidas), así
+    que el costo es O(filas x columnas²) sin importar el tamaño de la ventana.
+    """
+    rows, columns = matrix.shape
+    if rows < window:
+        empty = np.empty((0, columns, columns))
+        return empty, empty
+
+    valid = ~np.isnan(matrix)
+    # Centrar cada columna reduce la cancelación numérica en las sumas acumuladas
+    x = np.where(valid, matrix, 0.0)
+    x -= x.sum(axis=0) / np.maximum(valid.sum(axis=0), 1)
+    x[~valid] = 0.0
+
+    def window_sums(values):
+        cumulative = np.cumsum(values, axis=0)
+        cumulative = np.concatenate([np.zeros((1,) + values.shape[1:]), cumulative])
+        return cumulative[window:] - cumulative[:-window]
+
+    sums = window_sums(x)                                                  # (ventanas, columnas)
+    products = window_sums(x[:, :, None] * x[:, None, :])                  # (ventanas, columnas, columnas)
+    counts = window_sums((valid[:, :, None] & valid[:, None, :]).astype(np.float64))
+
+    covariance = (products - sums[:, :, None] * sums[:, None, :] / window) / (window - 1)
+    covariance[counts < window] = np.nan
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        std = np.sqrt(np.diagonal(covariance, axis1=1, axis2=2))
+        correlation = covariance / (std[:, :, None] * std[:, None, :])
+    return correlation, covariance
+
+def rolling_pairs(correlation: np.ndarray, covariance: np.ndarray, codes: list) -> dict:
+    """
+    Series móviles por par (i < j) en vez de matrices completas por ventana:
+    la matriz es simétrica y su diagonal de correlación es siempre 1, así que
+    basta el triángulo superior más las varianzas. Para 5 indicadores son
+    10 + 5 valores por ventana en vez de 2 x 25.
+    """
+    rows, columns = np.triu_indices(len(codes), k=1)
+    return {
+        'pairs': [[codes[i], codes[j]] for i, j in zip(rows.tolist(), columns.tolist())],
+        'correlation': to_list(correlation[:, rows, columns]),
+        'covariance': to_list(covariance[:, rows, columns]),
+        'variance': to_list(np.diagonal(covariance, axis1=1, axis2=2))
+    }
+
+def to_list(array: np.ndarray) -> list:
+    """Array -> listas anidadas para JSON, con NaN/inf como null."""
+    return np.where(np.isfinite(array), array, None).tolist()
+
+
+class MatrixCache:
+    """
+    Caché en memoria (por proceso) de respuestas de /api/matrix ya
+    serializadas, por (códigos, rango, parámetros), con TTL y un tope
+    de bytes (LRU). Una respuesta más grande que el tope no se guarda.
+    """
+
+    def __init__(self, ttl_seconds: float, max_bytes: int):
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()  # clave -> (expira, body)
+        self._bytes = 0
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, body = entry
+            if time.monotonic() >= expires_at:
+                self._pop(key)
+                return None
+            self._entries.move_to_end(key)
+            return body
+
+    def set(self, key, body: bytes):
+        if len(body) > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                self._pop(key)
+            self._entries[key] = (time.monotonic() + self.ttl_seconds, body)
+            self._bytes += len(body)
+            while self._bytes > self.max_bytes:
+                self._pop(next(iter(self._entries)))
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def _pop(self, key):
+        _, body = self._entries.pop(key)
+        self._bytes -= len(body)
+
+
+matrix_cache = MatrixCache(Config.MATRIX_CACHE_TTL_SECONDS, Config.MATRIX_CACHE_MAX_BYTES)
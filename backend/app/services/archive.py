@@ -0,0 +1,106 @@
+import gzip
+import hashlib
+import json
+import os
+import threading
+from datetime import datetime
+from app.config import Config
+from app.utils.files import write_atomic
+from app.utils.logger import setup_logger
+
+logger = setup_logger('archive')
+
+class ResponseArchive:
+    """
+    Archivo local de respuestas crudas de mindicador.cl (Config.ARCHIVE_DIR).
+
+    Cada respuesta se guarda comprimida con gzip y direccionada por el
+    sha256 de su contenido (objects/ab/abcd....json.gz), así que grabar dos
+    veces la misma respuesta no ocupa espacio extra. index.json lista, por
+    indicador, las grabaciones en orden; el replay usa la más reciente.
+    """
+
+    INDEX = 'index.json'
+
+    def __init__(self, base_dir: str):
+        self.base_dir = base_dir
+        self._lock = threading.Lock()
+        self._index = None
+
+    def _object_path(self, digest: str) -> str:
+        return os.path.join(self.base_dir, 'objects', digest[:2], f"{digest}.json.gz")
+
+    def _load_index(self) -> dict:
+        if self._index is None:
+            try:
+                with open(os.path.join(self.base_dir, self.INDEX), 'rb') as f:
+                    self._index = json.load(f)
+            except FileNotFoundError:
+                self._index = {}
+        return self._index
+
+    def save(self, code: str, body: bytes, url: str = None) -> str:
+        """Guardar una respuesta cruda. Retorna su sha256."""
+        digest = hashlib.sha256(body).hexdigest()
+        path = self._object_path(digest)
+
+        with self._lock:
+            if not os.path.exists(path):
+                write_atomic(path, gzip.compress(body, compresslevel=9, mtime=0))
+
+            index = self._load_index()
+            entries = index.setdefault(code, [])
+            if entries and entries[-1]['sha256'] == digest:
+                # Misma respuesta que la última grabación: nada nuevo que indexar
+                return digest
+            entries.append({
+                'sha256': digest,
+                'recorded_at': datetime.now().isoformat(),
+                'bytes': len(body),
+                'url': url
+            })
+            write_atomic(
+                os.path.join(self.base_dir, self.INDEX),
+                json.dumps(index, indent=2).encode('utf-8')
+            )
+
+        logger.info(f"Respuesta de '{code}' archivada ({len(body)} bytes, sha256 {digest[:12]})")
+        return digest
+
+    def load(self, code: str, digest: str = None):
+        """
+        Bytes de la última grabación de `code` (o de la indicada por `digest`),
+        o None si no existe o no coincide con su hash.
+        """
+        with self._lock:
+            entries = self._load_index().get(code)
+        if not entries:
+            return None
+
+        digest = digest or entries[-1]['sha256']
+        try:
+            with open(self._object_path(digest), 'rb') as f:
+                body = gzip.decompress(f.read())
+        except FileNotFoundError:
+            logger.error(f"Falta el objeto {digest} de '{code}' en {self.base_dir}")
+            return None
+
+        if hashlib.sha256(body).hexdigest() != digest:
+            logger.error(f"El objeto {digest} de '{code}' está corrupto (hash distinto)")
+            return None
+        return body
+
+    def codes(self) -> list:
+        """Indicadores con al menos una grabación."""
+        with self._lock:
+            return sorted(self._load_index().keys())
+
+
+_archive = None
+
+def get_archive():
+    """Archivo de respuestas del proceso, en Config.ARCHIVE_DIR."""
+    global _archive
+    if _archive is None or _archive.base_dir != Config.ARCHIVE_DIR:
+        _archive = ResponseArchive(Config.ARCHIVE_DIR)
+    return _archive
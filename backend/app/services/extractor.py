@@ -1,6 +1,7 @@
 import requests
 import json
 from app.config import Config
+from app.services.archive import get_archive
 from app.utils.logger import setup_logger
 
 logger = setup_logger('extractor')
@@ -8,11 +9,20 @@ logger = setup_logger('extractor')
 # OJO: La URL base ahora termina en /
 MINDICADOR_API_BASE_URL = Config.MINDICADOR_API_URL.rstrip('/') + '/'
 
+# Modos de extracción (Config.EXTRACTOR_MODE)
+#   live:   siempre a la API
+#   record: a la API, guardando la respuesta cruda en el archivo local
+#   replay: desde el archivo local, sin red
+EXTRACTOR_MODES = ('live', 'record', 'replay')
+
 def fetch_indicator_history(indicator_code: str) -> dict:
     """
     Se conecta a la API de Mindicador y obtiene el historial
     COMPLETO de un indicador específico.
     
+    Según Config.EXTRACTOR_MODE, además graba la respuesta ('record')
+    o la lee del archivo local en vez de ir a la red ('replay').
+    
     Args:
         indicator_code (str): El código del indicador (ej: 'dolar', 'uf')
 
@@ -20,6 +30,9 @@ def fetch_indicator_history(indicator_code: str) -> dict:
         dict: Un diccionario con los datos del indicador, o None si falla.
               Ej: {'codigo': 'dolar', 'nombre': '...', 'serie': [{'fecha': '...', 'valor': ...}, ...]}
     """
+    if Config.EXTRACTOR_MODE == 'replay':
+        return replay_indicator_history(indicator_code)
+
     api_url = f"{MINDICADOR_API_BASE_URL}{indicator_code}"
     logger.info(f"Iniciando extracción de historial para '{indicator_code}' desde: {api_url}")
 
@@ -27,11 +40,13 @@ def fetch_indicator_history(indicator_code: str) -> dict:
         response = requests.get(api_url, timeout=20) # Timeout más largo para historial
         response.raise_for_status()
         
-        data = response.json()
+        if Config.EXTRACTOR_MODE == 'record':
+            get_archive().save(indicator_code, response.content, url=api_url)
+        
+        # Se parsean los mismos bytes que se archivan: el replay da el mismo resultado
+        data = json.loads(response.content)
         
-        # Validar que la respuesta tenga la data histórica
-        if 'serie' not in data or not data['serie']:
-            logger.warning(f"Respuesta de API para '{indicator_code}' no contiene 'serie' de datos.")
+        if not has_series(indicator_code, data):
             return None
             
         logger.info(f"Datos históricos de '{indicator_code}' extraídos exitosamente.")
@@ -42,12 +57,41 @@ def fetch_indicator_history(indicator_code: str) -> dict:
         if e.response.status_code == 404:
             logger.warning(f"API devolvió 404 para '{indicator_code}'. El indicador puede no existir.")
             return None
-        logger.error(f"Error HTTP para '{indicator_code}': {e.status_code} - {e.response.text}")
+        logger.error(f"Error HTTP para '{indicator_code}': {e.response.status_code} - {e.response.text}")
         return None
     except Exception as e:
         logger.error(f"Error inesperado en extractor para '{indicator_code}': {e}", exc_info=True)
         return None
 
+def replay_indicator_history(indicator_code: str) -> dict:
+    """
+    Igual que fetch_indicator_history, pero desde la última respuesta
+    grabada en el archivo local (Config.ARCHIVE_DIR). None si no hay grabación.
+    """
+    body = get_archive().load(indicator_code)
+    if body is None:
+        logger.error(f"No hay una respuesta grabada para '{indicator_code}' en '{Config.ARCHIVE_DIR}'.")
+        return None
+
+    try:
+        data = json.loads(body)
+    except ValueError as e:
+        logger.error(f"Respuesta grabada inválida para '{indicator_code}': {e}")
+        return None
+
+    if not has_series(indicator_code, data):
+        return None
+
+    logger.info(f"Datos históricos de '{indicator_code}' leídos del archivo local.")
+    return data
+
+def has_series(indicator_code: str, data: dict) -> bool:
+    """Validar que la respuesta tenga la data histórica."""
+    if 'serie' not in data or not data['serie']:
+        logger.warning(f"Respuesta de API para '{indicator_code}' no contiene 'serie' de datos.")
+        return False
+    return True
+
 # --- Bloque de Auto-Test ---
 if __name__ == "__main__":
     
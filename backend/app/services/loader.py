@@ -1,12 +1,17 @@
 from app import get_db
 from app.models import Indicator, IndicatorValue
+from app.services.notifier import notify_changes
 from app.utils.logger import setup_logger
+from sqlalchemy import text
 from sqlalchemy.exc import IntegrityError, SQLAlchemyError
 from sqlalchemy.orm.exc import NoResultFound
 
 # Configurar logger para este módulo
 logger = setup_logger('loader')
 
+# Clave del advisory lock que ordena el sellado de updated_at entre cargas
+STAMP_LOCK_KEY = 7_340_001
+
 def load_data(clean_data: list):
     """
     Carga la lista de datos limpios en la base de datos PostgreSQL.
@@ -15,6 +20,9 @@ def load_data(clean_data: list):
     Args:
         clean_data (list): La lista de diccionarios limpios del transformador.
                            Ej: [{'code': 'dolar', 'value': Decimal('...'), 'date': date(...) }, ...]
+
+    Returns:
+        int: Registros nuevos/actualizados, o None si la carga falló.
     """
     
     # Este módulo NECESITA un contexto de Flask para acceder a get_db()
@@ -26,7 +34,7 @@ def load_data(clean_data: list):
     except Exception as e:
         logger.error(f"Error crítico al obtener la sesión de DB: {e}")
         logger.error("El Loader no puede funcionar sin un contexto de aplicación Flask.")
-        return
+        return None
 
     # --- Optimización: Cachear IDs de indicadores ---
     # Hacemos una sola consulta para traer todos los indicadores
@@ -38,10 +46,11 @@ def load_data(clean_data: list):
     except Exception as e:
         logger.error(f"Error al cargar el mapa de indicadores desde la DB: {e}")
         db.close()
-        return
+        return None
 
     new_records_count = 0
     skipped_records_count = 0
+    changes = []  # Para notificar a los clientes conectados (/api/stream)
 
     for item in clean_data:
         code = item['code']
@@ -75,6 +84,7 @@ def load_data(clean_data: list):
                     logger.info(f"Actualizando valor para '{code}' en fecha {date}.")
                     existing_value.value = value
                     new_records_count += 1 # Contamos como actualización
+                    changes.append(item)
             else:
                 # El registro no existe, lo creamos
                 new_value = IndicatorValue(
@@ -84,25 +94,73 @@ def load_data(clean_data: list):
                 )
                 db.add(new_value)
                 new_records_count += 1
+                changes.append(item)
         
         except SQLAlchemyError as e:
             logger.error(f"Error de base de datos procesando '{code}' en {date}: {e}")
             db.rollback() # Revertir esta operación fallida
+            # El rollback descarta toda la transacción, no solo este item:
+            # lo pendiente no se escribirá, así que tampoco se cuenta ni se notifica
+            if changes:
+                logger.warning(f"Se descartan {len(changes)} cambios pendientes por el rollback.")
+            new_records_count = 0
+            changes = []
             continue # Continuar con el siguiente item
 
     # 3. Finalizar la transacción
+    # (las notificaciones se entregan recién cuando el commit confirma)
     try:
+        stamp_changes(db, [(indicator_id_map[c['code']], c['date']) for c in changes])
+        notify_changes(db, [
+            {'code': c['code'], 'date': c['date'].isoformat(), 'value': float(c['value'])}
+            for c in changes
+        ])
         db.commit()
         logger.info("Carga de datos completada exitosamente.")
         logger.info(f"Registros nuevos/actualizados: {new_records_count}")
         logger.info(f"Registros omitidos (duplicados): {skipped_records_count}")
+        return new_records_count
     except SQLAlchemyError as e:
         logger.error(f"Error al hacer commit final a la base de datos: {e}")
         db.rollback()
+        return None
     finally:
         db.close()
         logger.info("Sesión de base de datos cerrada.")
 
+def stamp_changes(db, keys: list):
+    """
+    Fija updated_at de las filas nuevas/corregidas de esta transacción con
+    un único instante tomado justo antes del commit, en la base de datos.
+
+    updated_at es el cursor de ?since=: debe crecer en orden de commit. Un
+    valor tomado al escribir cada fila (o al inicio de la transacción) no lo
+    cumple si dos cargas se solapan: una fila podría confirmarse con un
+    updated_at menor que la 'version' que un cliente ya tiene, y ese cliente
+    nunca la recibiría. El advisory lock (hasta el commit) hace que cada
+    carga selle después de que la anterior confirmó.
+
+    Args:
+        db: Sesión de la carga (antes del commit).
+        keys (list): [(indicator_id, date), ...] de las filas modificadas.
+    """
+    if not keys or db.get_bind().dialect.name != 'postgresql':
+        return
+
+    db.flush()
+    db.execute(text('SELECT pg_advisory_xact_lock(:key)'), {'key': STAMP_LOCK_KEY})
+    # clock_timestamp() y no now(): now() es el inicio de la transacción
+    stamp = db.execute(text('SELECT clock_timestamp()::timestamp')).scalar()
+    db.execute(
+        text("""
+            UPDATE indicator_values AS v
+            SET updated_at = :stamp
+            FROM unnest(CAST(:ids AS integer[]), CAST(:dates AS date[])) AS c(indicator_id, date)
+            WHERE v.indicator_id = c.indicator_id AND v.date = c.date
+        """),
+        {'stamp': stamp, 'ids': [indicator_id for indicator_id, _ in keys], 'dates': [d for _, d in keys]}
+    )
+
 # --- Bloque de Auto-Test ---
 if __name__ == "__main__":
     logger.warning("Este módulo no se puede ejecutar directamente.")
@@ -0,0 +1,151 @@
+import json
+import os
+import queue
+import select
+import threading
+import time
+import psycopg2
+from psycopg2.extensions import ISOLATION_LEVEL_AUTOCOMMIT
+from sqlalchemy import text
+from app import pin_reads_to_primary
+from app.config import Config
+from app.utils.logger import setup_logger
+
+logger = setup_logger('notifier')
+
+# Límite de PostgreSQL: 8000 bytes por payload de NOTIFY.
+# Cada evento ocupa ~60 bytes, así que se envían en lotes.
+EVENTS_PER_NOTIFY = 100
+
+def notify_changes(db, changes: list):
+    """
+    Publica los valores nuevos/corregidos en el canal de NOTIFY.
+
+    Debe llamarse dentro de la transacción del loader, antes del commit:
+    PostgreSQL solo entrega las notificaciones si la transacción confirma.
+
+    Args:
+        db: Sesión de base de datos (la misma de la carga).
+        changes (list): [{'code': 'dolar', 'date': '2025-11-05', 'value': 945.13}, ...]
+    """
+    if not changes or db.get_bind().dialect.name != 'postgresql':
+        return
+
+    # Una carga masiva (ej: historial completo) no se transmite fila a fila:
+    # los clientes reciben un 'resync' y piden el delta con ?since=
+    if len(changes) > Config.NOTIFY_MAX_EVENTS:
+        codes = sorted({change['code'] for change in changes})
+        messages = [{'type': 'resync', 'codes': codes}]
+    else:
+        messages = [
+            {'type': 'values', 'events': changes[i:i + EVENTS_PER_NOTIFY]}
+            for i in range(0, len(changes), EVENTS_PER_NOTIFY)
+        ]
+
+    for message in messages:
+        db.execute(
+            text('SELECT pg_notify(:channel, :payload)'),
+            {'channel': Config.NOTIFY_CHANNEL, 'payload': json.dumps(message)}
+        )
+    logger.info(f"{len(changes)} cambios publicados en '{Config.NOTIFY_CHANNEL}' ({len(messages)} NOTIFY).")
+
+
+class ChangeBroadcaster:
+    """
+    Reparte las notificaciones de PostgreSQL entre los clientes SSE
+    conectados a este worker.
+
+    Cada worker mantiene UNA conexión dedicada con LISTEN (fuera del pool),
+    abierta en un thread de fondo al llegar el primer suscriptor. Así la
+    base de datos atiende una conexión por worker, no una por dashboard.
+    """
+
+    RECONNECT_SECONDS = 5
+    SELECT_TIMEOUT_SECONDS = 30
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._subscribers = set()
+        self._thread = None
+        self._pid = None
+
+    def subscribe(self):
+        """
+        Registrar un cliente; recibe los mensajes en la cola retornada.
+        Retorna None si el worker ya tiene Config.STREAM_MAX_CLIENTS clientes:
+        cada stream ocupa un thread, y el resto debe quedar para las demás rutas.
+        """
+        subscriber = queue.Queue(maxsize=Config.STREAM_QUEUE_SIZE)
+        with self._lock:
+            if len(self._subscribers) >= Config.STREAM_MAX_CLIENTS:
+                return None
+            self._subscribers.add(subscriber)
+            self._ensure_listener()
+        return subscriber
+
+    def unsubscribe(self, subscriber: queue.Queue):
+        with self._lock:
+            self._subscribers.discard(subscriber)
+
+    def count(self) -> int:
+        """Clientes SSE conectados a este worker."""
+        with self._lock:
+            return len(self._subscribers)
+
+    def publish(self, message: dict):
+        """Entregar un mensaje a todos los clientes de este worker."""
+        with self._lock:
+            subscribers = list(self._subscribers)
+
+        for subscriber in subscribers:
+            try:
+                subscriber.put_nowait(message)
+            except queue.Full:
+                # Cliente lento: pierde el mensaje, se pondrá al día con ?since=
+                logger.warning("Cola de cliente SSE llena. Mensaje descartado.")
+
+    def ensure_listener(self):
+        """Levantar el LISTEN aunque no haya clientes SSE (lo usa el pin de réplicas)."""
+        with self._lock:
+            self._ensure_listener()
+
+    def _ensure_listener(self):
+        # El thread no sobrevive a un fork: se vuelve a crear en cada worker
+        if self._thread is not None and self._thread.is_alive() and self._pid == os.getpid():
+            return
+        self._pid = os.getpid()
+        self._thread = threading.Thread(target=self._listen_forever, name='pg-listener', daemon=True)
+        self._thread.start()
+
+    def _listen_forever(self):
+        while True:
+            try:
+                self._listen()
+            except Exception as e:
+                logger.error(f"Error en LISTEN '{Config.NOTIFY_CHANNEL}': {e}. Reintentando en {self.RECONNECT_SECONDS}s.")
+            time.sleep(self.RECONNECT_SECONDS)
+
+    def _listen(self):
+        conn = psycopg2.connect(Config.SQLALCHEMY_DATABASE_URI)
+        conn.set_isolation_level(ISOLATION_LEVEL_AUTOCOMMIT)
+        try:
+            with conn.cursor() as cursor:
+                cursor.execute(f"LISTEN {Config.NOTIFY_CHANNEL}")
+            logger.info(f"Escuchando notificaciones en '{Config.NOTIFY_CHANNEL}' (pid {os.getpid()}).")
+
+            while True:
+                readable, _, _ = select.select([conn], [], [], self.SELECT_TIMEOUT_SECONDS)
+                if not readable:
+                    continue
+                conn.poll()
+                while conn.notifies:
+                    notification = conn.notifies.pop(0)
+                    # El ETL acaba de escribir en el primario: las réplicas pueden
+                    # no tenerlo aún, así que este worker lee del primario un rato
+                    pin_reads_to_primary()
+                    self.publish(json.loads(notification.payload))
+        finally:
+            conn.close()
+
+# Broadcaster del proceso
+broadcaster = ChangeBroadcaster()
@@ -0,0 +1,237 @@
+import base64
+import json
+from sqlalchemy import desc, func
+from app.models import Indicator, IndicatorValue
+from datetime import date, datetime, timedelta
+
+# Valores por defecto de /history
+DEFAULT_HISTORY_DAYS = 30
+DEFAULT_HISTORY_LIMIT = 100
+
+def indicators_payload(db) -> list:
+    """
+    Construye la respuesta de /api/indicators:
+    todos los indicadores con su último valor.
+    """
+    indicators = db.query(
+        Indicator.id,
+        Indicator.code,
+        Indicator.name,
+        Indicator.unit,
+        IndicatorValue.value,
+        IndicatorValue.date
+    ).outerjoin(
+        IndicatorValue,
+        Indicator.id == IndicatorValue.indicator_id
+    ).distinct(
+        Indicator.id
+    ).order_by(
+        Indicator.id,
+        desc(IndicatorValue.date)
+    ).all()
+
+    return [
+        {
+            'id': ind.id,
+            'code': ind.code,
+            'name': ind.name,
+            'unit': ind.unit,
+            'latest_value': float(ind.value) if ind.value else None,
+            'latest_date': ind.date.isoformat() if ind.date else None
+        }
+        for ind in indicators
+    ]
+
+def history_payload(db, indicator, days: int = DEFAULT_HISTORY_DAYS,
+                    limit: int = DEFAULT_HISTORY_LIMIT, since: datetime = None,
+                    date_from: date = None, date_to: date = None, cursor: str = None) -> dict:
+    """
+    Construye la respuesta de /api/indicators/<code>/history
+    para un indicador ya encontrado.
+
+    Paginación keyset sobre (indicator_id, date), servida por el índice
+    idx_indicator_values_indicator_date: cada página es un range scan que
+    parte donde terminó la anterior, así que la página N cuesta lo mismo
+    que la primera (a diferencia de OFFSET).
+
+    Args:
+        days: Días hacia atrás desde hoy (se ignora si se indica date_from/date_to).
+        limit: Máximo de registros por página (None = sin límite).
+        since: Si se indica, solo filas insertadas/corregidas después de
+               ese instante (sync incremental).
+        date_from, date_to: Rango explícito de fechas (inclusive; cualquiera puede faltar).
+        cursor: 'next_cursor' de la página anterior. Trae el rango y el `since`
+                resueltos en la primera página, que reemplazan a days/date_from/
+                date_to/since: la paginación no cambia con la fecha de hoy.
+
+    Raises:
+        ValueError: Si el cursor es inválido o de otro indicador.
+    """
+    query = db.query(IndicatorValue)\
+        .filter(IndicatorValue.indicator_id == indicator.id)
+
+    last_date = None
+    if cursor:
+        last_date, date_from, date_to, since = decode_cursor(cursor, indicator.id)
+    elif date_from is None and date_to is None:
+        # Calcular fecha desde
+        date_from = datetime.now().date() - timedelta(days=days)
+    if date_from is not None:
+        query = query.filter(IndicatorValue.date >= date_from)
+    if date_to is not None:
+        query = query.filter(IndicatorValue.date <= date_to)
+    if last_date is not None:
+        query = query.filter(IndicatorValue.date < last_date)
+    if since is not None:
+        query = query.filter(IndicatorValue.updated_at > since)
+
+    query = query.order_by(desc(IndicatorValue.date))
+    if limit is not None:
+        # Una fila extra indica si hay otra página
+        query = query.limit(limit + 1)
+    values = query.all()
+
+    next_cursor = None
+    if limit is not None and len(values) > limit:
+        values = values[:limit]
+        next_cursor = encode_cursor(indicator.id, values[-1].date, date_from, date_to, since)
+
+    result = _series(indicator, values, since)
+    result['next_cursor'] = next_cursor
+    return result
+
+def encode_cursor(indicator_id: int, last_date: date, date_from: date = None,
+                  date_to: date = None, since: datetime = None) -> str:
+    """
+    Cursor opaco (y estable) con la última clave de la página y el rango
+    ya resuelto de la consulta: el mismo cursor da la misma página cualquier día.
+    """
+    raw = json.dumps({
+        'i': indicator_id,
+        'd': last_date.isoformat(),
+        'f': date_from.isoformat() if date_from else None,
+        't': date_to.isoformat() if date_to else None,
+        's': since.isoformat() if since else None
+    }, separators=(',', ':'))
+    return base64.urlsafe_b64encode(raw.encode('utf-8')).decode('ascii').rstrip('=')
+
+def decode_cursor(cursor: str, indicator_id: int):
+    """
+    (última fecha de la página anterior, date_from, date_to, since) del cursor.
+    Lanza ValueError si el cursor no es válido o es de otro indicador.
+    """
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        data = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+        cursor_indicator = data['i']
+        last_date = date.fromisoformat(data['d'])
+        date_from = date.fromisoformat(data['f']) if data['f'] else None
+        date_to = date.fromisoformat(data['t']) if data['t'] else None
+        since = datetime.fromisoformat(data['s']) if data['s'] else None
+    except (ValueError, KeyError, TypeError) as e:
+        raise ValueError(f"Cursor inválido: {e}")
+
+    if cursor_indicator != indicator_id:
+        raise ValueError("El cursor pertenece a otro indicador")
+    return last_date, date_from, date_to, since
+
+def history_batch_payload(db, indicators: list, days: int, since: datetime = None) -> dict:
+    """
+    Construye la respuesta de /api/history: el historial de varios
+    indicadores en una sola query.
+    """
+    date_from = datetime.now().date() - timedelta(days=days)
+    ids = [indicator.id for indicator in indicators]
+
+    query = db.query(IndicatorValue)\
+        .filter(
+            IndicatorValue.indicator_id.in_(ids),
+            IndicatorValue.date >= date_from
+        )
+    if since is not None:
+        query = query.filter(IndicatorValue.updated_at > since)
+    values = query.order_by(IndicatorValue.indicator_id, desc(IndicatorValue.date)).all()
+
+    # Agrupar por indicador (la query ya viene ordenada por fecha)
+    values_by_id = {indicator_id: [] for indicator_id in ids}
+    for v in values:
+        values_by_id[v.indicator_id].append(v)
+
+    series = {
+        indicator.code: _series(indicator, values_by_id[indicator.id], since)
+        for indicator in indicators
+    }
+    versions = [s['version'] for s in series.values() if s['version']]
+
+    return {
+        'series': series,
+        'version': max(versions) if versions else None
+    }
+
+def _series(indicator, values: list, since: datetime = None) -> dict:
+    """
+    Serializar una serie. 'version' es el último updated_at incluido:
+    el cliente lo envía como ?since= para pedir solo los cambios posteriores.
+    """
+    if values:
+        version = max(v.updated_at for v in values).isoformat()
+    else:
+        version = since.isoformat() if since else None
+
+    return {
+        'indicator': {
+            'code': indicator.code,
+            'name': indicator.name,
+            'unit': indicator.unit
+        },
+        'values': [
+            {
+                'value': float(v.value),
+                'date': v.date.isoformat()
+            }
+            for v in values
+        ],
+        'count': len(values),
+        'version': version
+    }
+
+def latest_stats_payload(db) -> dict:
+    """
+    Construye la respuesta de /api/stats/latest:
+    el último valor de cada indicador, con metadata.
+    """
+    # Subquery para obtener el último valor de cada indicador
+    subq = db.query(
+        IndicatorValue.indicator_id,
+        func.max(IndicatorValue.date).label('max_date')
+    ).group_by(IndicatorValue.indicator_id).subquery()
+
+    latest = db.query(
+        Indicator.code,
+        Indicator.name,
+        Indicator.unit,
+        IndicatorValue.value,
+        IndicatorValue.date
+    ).join(
+        IndicatorValue,
+        Indicator.id == IndicatorValue.indicator_id
+    ).join(
+        subq,
+        (IndicatorValue.indicator_id == subq.c.indicator_id) &
+        (IndicatorValue.date == subq.c.max_date)
+    ).all()
+
+    return {
+        'timestamp': datetime.now().isoformat(),
+        'indicators': [
+            {
+                'code': item.code,
+                'name': item.name,
+                'unit': item.unit,
+                'value': float(item.value),
+                'date': item.date.isoformat()
+            }
+            for item in latest
+        ],
+        'count': len(latest)
+    }
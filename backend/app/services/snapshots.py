@@ -0,0 +1,198 @@
+import gzip
+import json
+import os
+import shutil
+import threading
+from datetime import datetime
+from app.config import Config
+from app.models import Indicator
+from app.services.payloads import indicators_payload, history_batch_payload, latest_stats_payload
+from app.utils.files import write_atomic
+from app.utils.logger import setup_logger
+
+try:
+    import brotli
+except ImportError:  # Brotli es opcional: sin él solo se generan snapshots gzip
+    brotli = None
+
+logger = setup_logger('snapshots')
+
+# Ventana que sincroniza el dashboard al cargar (CACHE_DAYS en main.js):
+# los botones de período se resuelven desde su caché local
+HISTORY_BATCH_DAYS = 365
+
+# Content-Encoding -> extensión en disco
+ENCODINGS = {'br': 'br', 'gzip': 'gz'}
+
+# Claves de los snapshots
+KEY_INDICATORS = 'indicators'
+KEY_LATEST = 'stats_latest'
+
+def history_batch_key(codes: list, days: int) -> str:
+    """Clave de /api/history?codes=...&days=... (el orden de los códigos no importa)."""
+    return f"history_batch/{days}/{'+'.join(sorted(set(codes)))}"
+
+def render_json(payload) -> bytes:
+    """Serializar igual que jsonify (claves ordenadas, formato compacto)."""
+    return (json.dumps(payload, sort_keys=True, separators=(',', ':')) + '\n').encode('utf-8')
+
+def compress(body: bytes) -> dict:
+    """
+    Comprimir un payload en todas las codificaciones disponibles.
+    Se usa el nivel máximo: el costo lo paga el ETL una sola vez.
+    """
+    encoded = {'gzip': gzip.compress(body, compresslevel=9, mtime=0)}
+    if brotli is not None:
+        encoded['br'] = brotli.compress(body, quality=11, mode=brotli.MODE_TEXT)
+    return encoded
+
+
+class DiskSnapshotStore:
+    """
+    Snapshots como archivos en Config.SNAPSHOT_DIR, compartidos entre
+    el proceso ETL (escribe) y los workers de la API (leen).
+
+    Cada corrida del ETL escribe una generación completa en su propia
+    carpeta y recién entonces publica manifest.json apuntando a ella: un
+    worker nunca mezcla archivos de dos corridas, y solo sirve las claves
+    listadas en el manifest (un indicador eliminado deja de servirse).
+
+    Los workers mantienen los bytes en memoria y solo vuelven a leer
+    el disco cuando cambia manifest.json (un stat por petición).
+    """
+
+    MANIFEST = 'manifest.json'
+    # Generaciones que se conservan: la actual y la anterior (para
+    # workers que todavía leen con el manifest previo)
+    KEEP_GENERATIONS = 2
+
+    def __init__(self, base_dir: str):
+        self.base_dir = base_dir
+        self._lock = threading.Lock()
+        self._cache = {}
+        self._manifest_mtime = None
+        self._generation = None
+        self._keys = frozenset()
+        self.generated_at = None
+
+    def _path(self, generation: str, key: str, encoding: str) -> str:
+        return os.path.join(self.base_dir, generation, f"{key}.json.{ENCODINGS[encoding]}")
+
+    def replace_all(self, snapshots: dict, generated_at: datetime):
+        """Escribir todos los snapshots; el manifest va al final para publicar el lote."""
+        generation = generated_at.strftime('%Y%m%dT%H%M%S%f')
+        for key, encoded in snapshots.items():
+            for encoding, data in encoded.items():
+                write_atomic(self._path(generation, key, encoding), data)
+
+        manifest = {
+            'generated_at': generated_at.isoformat(),
+            'generation': generation,
+            'keys': sorted(snapshots.keys())
+        }
+        write_atomic(
+            os.path.join(self.base_dir, self.MANIFEST),
+            json.dumps(manifest, indent=2).encode('utf-8')
+        )
+        self._prune(generation)
+
+    def _prune(self, current: str):
+        """Borrar las generaciones viejas (los nombres ordenan por fecha)."""
+        generations = sorted(
+            name for name in os.listdir(self.base_dir)
+            if os.path.isdir(os.path.join(self.base_dir, name)) and name <= current
+        )
+        for name in generations[:-self.KEEP_GENERATIONS]:
+            shutil.rmtree(os.path.join(self.base_dir, name), ignore_errors=True)
+
+    def _refresh(self):
+        """Invalidar la caché en memoria si el ETL publicó un lote nuevo."""
+        try:
+            mtime = os.stat(os.path.join(self.base_dir, self.MANIFEST)).st_mtime_ns
+        except FileNotFoundError:
+            self._cache = {}
+            self._manifest_mtime = None
+            self._generation = None
+            self._keys = frozenset()
+            self.generated_at = None
+            return
+
+        if mtime == self._manifest_mtime:
+            return
+
+        with open(os.path.join(self.base_dir, self.MANIFEST), 'rb') as f:
+            manifest = json.load(f)
+        self._cache = {}
+        self._manifest_mtime = mtime
+        self._generation = manifest.get('generation')
+        self._keys = frozenset(manifest.get('keys', []))
+        self.generated_at = datetime.fromisoformat(manifest['generated_at'])
+
+    def get(self, key: str, encoding: str):
+        """Bytes comprimidos del snapshot, o None si no existe o está vencido."""
+        with self._lock:
+            self._refresh()
+            if not _is_fresh(self.generated_at) or self._generation is None or key not in self._keys:
+                return None
+
+            cache_key = (key, encoding)
+            if cache_key not in self._cache:
+                try:
+                    with open(self._path(self._generation, key, encoding), 'rb') as f:
+                        self._cache[cache_key] = f.read()
+                except FileNotFoundError:
+                    self._cache[cache_key] = None
+            return self._cache[cache_key]
+
+
+def _is_fresh(generated_at) -> bool:
+    """
+    Un snapshot solo es válido el mismo día en que se generó:
+    las ventanas de /history (?days=) son relativas a la fecha actual.
+    """
+    return generated_at is not None and generated_at.date() == datetime.now().date()
+
+_store = None
+
+def get_snapshot_store():
+    """Store de snapshots del proceso (en Config.SNAPSHOT_DIR)."""
+    global _store
+    if _store is None or _store.base_dir != Config.SNAPSHOT_DIR:
+        _store = DiskSnapshotStore(Config.SNAPSHOT_DIR)
+    return _store
+
+def build_snapshots(db) -> int:
+    """
+    Renderiza y comprime los payloads de los endpoints más consultados
+    por el dashboard y los publica en el store de snapshots.
+
+    Args:
+        db: Sesión de base de datos (la cierra quien la abrió).
+
+    Returns:
+        int: Cantidad de snapshots generados.
+    """
+    logger.info("Generando snapshots del dashboard...")
+    generated_at = datetime.now()
+
+    indicators = indicators_payload(db)
+    payloads = {
+        KEY_INDICATORS: indicators,
+        KEY_LATEST: latest_stats_payload(db)
+    }
+
+    # La sincronización inicial del dashboard: los mismos códigos que pide
+    # main.js (los indicadores con datos), sin ?since=
+    codes = [ind['code'] for ind in indicators if ind['latest_value'] is not None]
+    if codes:
+        with_data = db.query(Indicator).filter(Indicator.code.in_(codes)).all()
+        batch = history_batch_payload(db, with_data, HISTORY_BATCH_DAYS)
+        batch['missing'] = []
+        payloads[history_batch_key(codes, HISTORY_BATCH_DAYS)] = batch
+
+    snapshots = {key: compress(render_json(payload)) for key, payload in payloads.items()}
+    get_snapshot_store().replace_all(snapshots, generated_at)
+
+    encodings = 'gzip, br' if brotli is not None else 'gzip'
+    logger.info(f"Snapshots generados: {len(snapshots)} (codificaciones: {encodings})")
+    return len(snapshots)
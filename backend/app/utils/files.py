@@ -0,0 +1,19 @@
+import os
+import tempfile
+
+def write_atomic(path: str, data: bytes):
+    """
+    Escribir un archivo de forma atómica: se escribe un temporal en la misma
+    carpeta y se renombra (os.replace). Un lector ve el archivo anterior o el
+    nuevo completo, nunca uno a medias.
+    """
+    directory = os.path.dirname(path)
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=f".{os.path.basename(path)}.", suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
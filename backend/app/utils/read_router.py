@@ -0,0 +1,99 @@
+import itertools
+import threading
+import time
+from sqlalchemy import text
+from app.utils.logger import setup_logger
+
+logger = setup_logger('read_router')
+
+class ReadRouter:
+    """
+    Elige el engine para las lecturas de la API.
+
+    - Reparte entre las réplicas en round-robin.
+    - Salta las réplicas caídas (o con demasiado lag) durante `retry_seconds`.
+    - Si no hay réplicas sanas, o hay un "pin" activo (read-your-writes),
+      usa el primario.
+    """
+
+    def __init__(self, primary, replicas: list, health_check_seconds: float = 5,
+                 retry_seconds: float = 30, max_lag_seconds: float = None):
+        self.primary = primary
+        self.replicas = replicas
+        self.health_check_seconds = health_check_seconds
+        self.retry_seconds = retry_seconds
+        self.max_lag_seconds = max_lag_seconds
+        self._lock = threading.Lock()
+        self._counter = itertools.count()
+        self._checked_at = {}   # índice -> último chequeo exitoso
+        self._down_until = {}   # índice -> hasta cuándo se omite
+        self._primary_until = 0.0
+
+    def pick(self):
+        """Engine para la próxima lectura."""
+        if not self.replicas or time.monotonic() < self._primary_until:
+            return self.primary
+
+        start = next(self._counter)
+        for offset in range(len(self.replicas)):
+            index = (start + offset) % len(self.replicas)
+            if self._is_healthy(index):
+                return self.replicas[index]
+
+        logger.warning("Sin réplicas disponibles: leyendo desde el primario.")
+        return self.primary
+
+    def pin_primary(self, seconds: float):
+        """Leer desde el primario durante `seconds` (ej: tras una carga)."""
+        with self._lock:
+            self._primary_until = max(self._primary_until, time.monotonic() + seconds)
+
+    def status(self) -> list:
+        """Estado de cada réplica (para /api/ready)."""
+        now = time.monotonic()
+        return [
+            {
+                'host': engine.url.host,
+                'port': engine.url.port,
+                'healthy': self._down_until.get(index, 0) <= now
+            }
+            for index, engine in enumerate(self.replicas)
+        ]
+
+    def dispose(self):
+        for engine in self.replicas:
+            engine.dispose(close=False)
+
+    def _is_healthy(self, index: int) -> bool:
+        now = time.monotonic()
+        with self._lock:
+            if now < self._down_until.get(index, 0):
+                return False
+            if now - self._checked_at.get(index, 0) < self.health_check_seconds:
+                return True
+
+        # Chequeo real como máximo cada health_check_seconds por réplica
+        engine = self.replicas[index]
+        try:
+            with engine.connect() as conn:
+                if self.max_lag_seconds:
+                    # Si ya aplicó todo lo recibido, el lag es 0 aunque la última
+                    # transacción sea de hace horas (primario sin escrituras)
+                    lag = conn.execute(text(
+                        "SELECT CASE WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0 "
+                        "ELSE EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()) END"
+                    )).scalar()
+                    if lag is not None and lag > self.max_lag_seconds:
+                        raise RuntimeError(f"lag de replicación {lag:.0f}s")
+                else:
+                    conn.execute(text('SELECT 1'))
+        except Exception as e:
+            logger.error(f"Réplica {engine.url.host}:{engine.url.port} no disponible ({e}). "
+                         f"Se reintenta en {self.retry_seconds}s.")
+            with self._lock:
+                self._down_until[index] = now + self.retry_seconds
+            return False
+
+        with self._lock:
+            self._checked_at[index] = now
+        return True
@@ -0,0 +1,44 @@
+from app.services.loader import load_data
+from app.services.transformer import transform_historical_data
+from benchmarks.database import bench_app, bulk_insert_values, indicator_ids, truncate_values
+from benchmarks.harness import measure
+from benchmarks.synthetic import synthetic_payload
+
+BATCH_SIZES = (100, 1_000, 10_000)
+QUICK_BATCH_SIZES = (100, 1_000)
+DUPLICATE_RATIOS = (0.0, 0.5, 1.0)
+
+def run(quick: bool = False) -> dict:
+    """
+    load_data contra PostgreSQL desechable, variando el tamaño del lote
+    y la fracción de registros que ya existen con el mismo valor (duplicados).
+    """
+    app = bench_app()
+    results = {}
+
+    with app.app_context():
+        dolar_id = indicator_ids()['dolar']
+
+        for size in (QUICK_BATCH_SIZES if quick else BATCH_SIZES):
+            clean_data = transform_historical_data(synthetic_payload('dolar', size))
+
+            for ratio in DUPLICATE_RATIOS:
+                duplicates = [
+                    {'indicator_id': dolar_id, 'value': item['value'], 'date': item['date']}
+                    for item in clean_data[:int(size * ratio)]
+                ]
+
+                def setup():
+                    truncate_values()
+                    if duplicates:
+                        bulk_insert_values([dict(row) for row in duplicates])
+
+                results[f"loader.load_data[batch={size},dup={ratio:.0%}]"] = measure(
+                    lambda: load_data(clean_data),
+                    repeat=3 if size >= 10_000 else 5,
+                    items=size,
+                    setup=setup
+                )
+
+        truncate_values()
+    return results
@@ -0,0 +1,104 @@
+from datetime import date, timedelta
+from decimal import Decimal
+from app import get_db
+from app.services.analytics import matrix_cache
+from app.services.payloads import encode_cursor
+from app.services.snapshots import build_snapshots
+from benchmarks.database import bench_app, bulk_insert_values, indicator_ids, truncate_values
+from benchmarks.harness import measure
+
+# Filas por indicador (hay 6 indicadores en el catálogo)
+HISTORY_SIZES = (1_000, 10_000)
+QUICK_HISTORY_SIZES = (1_000,)
+REQUESTS_PER_CASE = 200
+QUICK_REQUESTS_PER_CASE = 50
+
+def routes(today: date, uf_id: int, size: int) -> list:
+    """(nombre, url) de cada ruta /api medida."""
+    # Cursor a ~90% del historial: una página "profunda"
+    deep_cursor = encode_cursor(uf_id, today - timedelta(days=int(size * 0.9)), date_to=today)
+    return [
+        ('indicators', '/api/indicators'),
+        ('indicator_detail', '/api/indicators/uf'),
+        ('history_30d', '/api/indicators/uf/history?days=30'),
+        ('history_365d', '/api/indicators/uf/history?days=365'),
+        ('history_page_500', f'/api/indicators/uf/history?to={today}&limit=500'),
+        ('history_deep_page_500', f'/api/indicators/uf/history?to={today}&limit=500&cursor={deep_cursor}'),
+        ('history_batch_365d', '/api/history?codes=dolar,uf,euro,utm,ipc,bitcoin&days=365'),
+        ('stats_latest', '/api/stats/latest'),
+        ('matrix_365d', '/api/matrix?codes=dolar,uf,euro,utm,ipc,bitcoin'),
+        ('matrix_365d_rolling_90', '/api/matrix?codes=dolar,uf,euro,utm,bitcoin&window=90'),
+        ('health', '/api/health'),
+        ('ready', '/api/ready'),
+    ]
+
+# Rutas que el ETL precalcula como snapshots
+SNAPSHOT_ROUTES = ('indicators', 'history_batch_365d', 'stats_latest')
+
+# Rutas con caché en memoria (MatrixCache): el camino normal se mide
+# vaciándola antes de cada petición, y aparte el acierto de caché
+CACHED_ROUTES = ('matrix_365d', 'matrix_365d_rolling_90')
+
+def seed(size: int, ids: dict, today: date):
+    truncate_values()
+    rows = []
+    for indicator_id in ids.values():
+        rows.extend(
+            {'indicator_id': indicator_id, 'value': Decimal(1000 + i % 500), 'date': today - timedelta(days=i)}
+            for i in range(size)
+        )
+    bulk_insert_values(rows)
+
+def run(quick: bool = False) -> dict:
+    """Cada ruta /api con el test client de Flask, a distintos tamaños de historial."""
+    app = bench_app()
+    client = app.test_client()
+    requests_per_case = QUICK_REQUESTS_PER_CASE if quick else REQUESTS_PER_CASE
+    today = date.today()
+    results = {}
+
+    with app.app_context():
+        ids = indicator_ids()
+
+        for size in (QUICK_HISTORY_SIZES if quick else HISTORY_SIZES):
+            seed(size, ids, today)
+            cases = routes(today, ids['uf'], size)
+
+            # Camino normal (query + serialización)
+            for name, url in cases:
+                if name in CACHED_ROUTES:
+                    results[f"routes.{name}[rows={size}]"] = measure(
+                        lambda: _get_uncached(client, url), repeat=requests_per_case
+                    )
+                    results[f"routes.{name}[rows={size},cached]"] = measure(
+                        lambda: _get(client, url), repeat=requests_per_case
+                    )
+                else:
+                    results[f"routes.{name}[rows={size}]"] = measure(
+                        lambda: _get(client, url), repeat=requests_per_case
+                    )
+
+            # Camino snapshot (bytes precomprimidos)
+            db = get_db()
+            build_snapshots(db)
+            db.close()
+            for name, url in cases:
+                if name in SNAPSHOT_ROUTES:
+                    results[f"routes.{name}[rows={size},snapshot]"] = measure(
+                        lambda: _get(client, url, {'Accept-Encoding': 'br, gzip'}),
+                        repeat=requests_per_case
+                    )
+
+        truncate_values()
+        matrix_cache.clear()
+    return results
+
+def _get_uncached(client, url):
+    matrix_cache.clear()
+    return _get(client, url)
+
+def _get(client, url, headers=None):
+    response = client.get(url, headers=headers)
+    if response.status_code != 200:
+        raise RuntimeError(f"{url} respondió {response.status_code}: {response.get_data(as_text=True)[:200]}")
+    return response
@@ -0,0 +1,21 @@
+from app.services.transformer import transform_historical_data
+from benchmarks.harness import measure
+from benchmarks.synthetic import synthetic_payload
+
+SIZES = (10_000, 100_000, 1_000_000)
+QUICK_SIZES = (10_000, 100_000)
+
+def run(quick: bool = False) -> dict:
+    """transform_historical_data sobre payloads 'serie' sintéticos de distintos tamaños."""
+    results = {}
+    for size in (QUICK_SIZES if quick else SIZES):
+        payload = synthetic_payload('dolar', size)
+        repeat = 5 if size <= 100_000 else 2
+
+        results[f"transformer.transform[{size}]"] = measure(
+            lambda: transform_historical_data(payload),
+            repeat=repeat,
+            items=size,
+            warmup=1 if size <= 100_000 else 0
+        )
+    return results
@@ -0,0 +1,84 @@
+import os
+import tempfile
+from datetime import datetime
+from sqlalchemy import insert, text
+from app.config import Config
+from app.models import Indicator, IndicatorValue
+
+# Script de esquema del proyecto (DROP + CREATE + indicadores maestros)
+SCHEMA_SQL = os.path.join(os.path.dirname(__file__), '..', '..', 'database', '__init__.sql')
+
+_app = None
+
+def bench_database_url():
+    """URL de la base desechable para benchmarks, o None si no está configurada."""
+    return os.environ.get('BENCH_DATABASE_URL')
+
+def bench_app():
+    """
+    App Flask apuntando a BENCH_DATABASE_URL, con el esquema recreado.
+
+    OJO: el esquema se borra y se vuelve a crear. Nunca apuntar a la base real.
+    """
+    global _app
+    if _app is not None:
+        return _app
+
+    url = bench_database_url()
+    if not url:
+        raise RuntimeError("Defina BENCH_DATABASE_URL (PostgreSQL desechable) para esta suite.")
+    if url == Config.SQLALCHEMY_DATABASE_URI:
+        raise RuntimeError("BENCH_DATABASE_URL no puede ser la base de datos de la aplicación.")
+
+    Config.SQLALCHEMY_DATABASE_URI = url
+    Config.DEBUG = False
+    # Snapshots en una carpeta desechable, no en la del ETL real
+    Config.SNAPSHOT_DIR = tempfile.mkdtemp(prefix='bench-snapshots-')
+
+    from app import create_app
+    _app = create_app()
+    reset_schema()
+    return _app
+
+def reset_schema():
+    """Ejecutar database/__init__.sql sobre la base de benchmarks."""
+    from app import engine
+    with open(SCHEMA_SQL, encoding='utf-8') as f:
+        sql = f.read()
+
+    conn = engine.raw_connection()
+    try:
+        with conn.cursor() as cursor:
+            cursor.execute(sql)
+        conn.commit()
+    finally:
+        conn.close()
+
+def indicator_ids() -> dict:
+    """{'dolar': 1, 'uf': 2, ...}"""
+    from app import get_db
+    db = get_db()
+    try:
+        return {code: id for id, code in db.query(Indicator.id, Indicator.code).all()}
+    finally:
+        db.close()
+
+def truncate_values():
+    from app import engine
+    with engine.begin() as conn:
+        conn.execute(text('TRUNCATE indicator_values RESTART IDENTITY'))
+
+def bulk_insert_values(rows: list):
+    """
+    Insertar filas directamente (sin pasar por el loader), para preparar datos.
+    rows: [{'indicator_id': 1, 'value': Decimal(...), 'date': date(...)}, ...]
+    """
+    from app import engine
+    now = datetime.now()
+    for row in rows:
+        row.setdefault('created_at', now)
+        row.setdefault('updated_at', now)
+
+    with engine.begin() as conn:
+        for i in range(0, len(rows), 5000):
+            conn.execute(insert(IndicatorValue), rows[i:i + 5000])
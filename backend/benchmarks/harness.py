@@ -0,0 +1,134 @@
+import gc
+import json
+import logging
+import os
+import platform
+import time
+import tracemalloc
+from datetime import datetime
+
+# Loggers de la app que escriben una línea por llamada: se silencian
+# durante las mediciones para no medir I/O de logging.
+NOISY_LOGGERS = ['app', 'api', 'extractor', 'transformer', 'loader', 'snapshots', 'notifier']
+
+def silence_app_loggers():
+    for name in NOISY_LOGGERS:
+        logging.getLogger(name).setLevel(logging.WARNING)
+
+def percentile(values: list, p: float) -> float:
+    """Percentil p (0-100) con interpolación lineal."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    k = (len(ordered) - 1) * p / 100
+    low = int(k)
+    high = min(low + 1, len(ordered) - 1)
+    return ordered[low] + (ordered[high] - ordered[low]) * (k - low)
+
+def measure(fn, repeat: int, items: int = 1, setup=None, warmup: int = 1,
+            track_memory: bool = True) -> dict:
+    """
+    Ejecuta fn() `repeat` veces y resume latencia, throughput y memoria.
+
+    Args:
+        fn: Función a medir (sin argumentos).
+        repeat: Cantidad de ejecuciones medidas.
+        items: Unidades procesadas por ejecución (registros, peticiones...).
+        setup: Se ejecuta antes de cada llamada, fuera del tiempo medido.
+        warmup: Ejecuciones previas no medidas.
+        track_memory: Ejecución extra con tracemalloc para el pico de memoria
+                      (aparte, porque tracemalloc distorsiona los tiempos).
+
+    Returns:
+        dict: {'p50_ms', 'p99_ms', 'mean_ms', 'throughput', 'peak_mem_mb', 'runs', 'items'}
+    """
+    for _ in range(warmup):
+        if setup:
+            setup()
+        fn()
+
+    timings = []
+    for _ in range(repeat):
+        if setup:
+            setup()
+        gc.collect()
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+
+    peak_mem_mb = None
+    if track_memory:
+        if setup:
+            setup()
+        gc.collect()
+        tracemalloc.start()
+        fn()
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        peak_mem_mb = round(peak / (1024 * 1024), 2)
+
+    total = sum(timings)
+    return {
+        'p50_ms': round(percentile(timings, 50) * 1000, 3),
+        'p99_ms': round(percentile(timings, 99) * 1000, 3),
+        'mean_ms': round(total / len(timings) * 1000, 3),
+        'throughput': round(items * len(timings) / total, 1) if total else None,
+        'peak_mem_mb': peak_mem_mb,
+        'runs': len(timings),
+        'items': items
+    }
+
+# --- Baseline ---
+
+def load_baseline(path: str) -> dict:
+    if not os.path.exists(path):
+        return None
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+def save_baseline(path: str, results: dict):
+    baseline = {
+        'created_at': datetime.now().isoformat(),
+        'python': platform.python_version(),
+        'machine': f"{platform.system()} {platform.machine()} ({os.cpu_count()} cpus)",
+        'results': results
+    }
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(baseline, f, indent=2, sort_keys=True)
+
+def compare_to_baseline(results: dict, baseline: dict, tolerance: float) -> list:
+    """
+    Compara cada caso con el baseline. Es regresión si p50/p99/memoria
+    suben, o el throughput baja, más que `tolerance` (ej: 0.2 = 20%).
+
+    Returns:
+        list: Descripciones de las regresiones encontradas (vacía si no hay).
+    """
+    regressions = []
+    for case, current in results.items():
+        previous = baseline['results'].get(case)
+        if previous is None:
+            continue
+
+        for metric in ('p50_ms', 'p99_ms', 'peak_mem_mb'):
+            old, new = previous.get(metric), current.get(metric)
+            if old and new and new > old * (1 + tolerance):
+                regressions.append(f"{case}: {metric} {old} -> {new} (+{(new / old - 1) * 100:.0f}%)")
+
+        old, new = previous.get('throughput'), current.get('throughput')
+        if old and new and new < old * (1 - tolerance):
+            regressions.append(f"{case}: throughput {old} -> {new} ({(new / old - 1) * 100:.0f}%)")
+
+    return regressions
+
+def missing_from_baseline(results: dict, baseline: dict) -> list:
+    """Casos medidos que el baseline no tiene (ej. rutas agregadas después de guardarlo)."""
+    return [case for case in results if case not in baseline['results']]
+
+def print_results(results: dict):
+    header = f"{'caso':<48} {'p50 ms':>10} {'p99 ms':>10} {'throughput/s':>14} {'peak MB':>9}"
+    print(header)
+    print('-' * len(header))
+    for case, r in results.items():
+        peak = '-' if r['peak_mem_mb'] is None else r['peak_mem_mb']
+        print(f"{case:<48} {r['p50_ms']:>10} {r['p99_ms']:>10} {r['throughput']:>14} {peak:>9}")
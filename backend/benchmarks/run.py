@@ -0,0 +1,90 @@
+import argparse
+import json
+import os
+import sys
+
+# Ejecutar desde backend/:  python -m benchmarks.run
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from benchmarks import bench_loader, bench_routes, bench_transformer
+from benchmarks.database import bench_database_url
+from benchmarks.harness import (
+    compare_to_baseline, load_baseline, missing_from_baseline, print_results, save_baseline,
+    silence_app_loggers
+)
+
+SUITES = {
+    'transformer': (bench_transformer, False),  # (módulo, requiere PostgreSQL)
+    'loader': (bench_loader, True),
+    'routes': (bench_routes, True),
+}
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(__file__), 'baseline.json')
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmarks del ETL y de la API')
+    parser.add_argument('--suite', default=','.join(SUITES),
+                        help=f"Suites separadas por coma ({', '.join(SUITES)})")
+    parser.add_argument('--quick', action='store_true',
+                        help='Tamaños reducidos (para iterar rápido, no para el baseline)')
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE, help='Archivo de baseline')
+    parser.add_argument('--save-baseline', action='store_true',
+                        help='Guardar estos resultados como nuevo baseline')
+    parser.add_argument('--require-baseline', action='store_true',
+                        help='Fallar si no hay baseline o si le faltan casos medidos (para CI/deploy)')
+    parser.add_argument('--tolerance', type=float, default=0.25,
+                        help='Variación permitida respecto al baseline (default 0.25 = 25%%)')
+    parser.add_argument('--output', help='Guardar los resultados en JSON')
+    args = parser.parse_args()
+
+    silence_app_loggers()
+
+    results = {}
+    for name in args.suite.split(','):
+        module, needs_db = SUITES[name.strip()]
+        if needs_db and not bench_database_url():
+            print(f"[omitida] '{name}': defina BENCH_DATABASE_URL (PostgreSQL desechable).")
+            continue
+        print(f"Ejecutando suite '{name}'...")
+        results.update(module.run(quick=args.quick))
+
+    print()
+    print_results(results)
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+
+    if args.save_baseline:
+        save_baseline(args.baseline, results)
+        print(f"\nBaseline guardado en {args.baseline}")
+        return 0
+
+    baseline = load_baseline(args.baseline)
+    if baseline is None:
+        print(f"\nSin baseline en {args.baseline} (use --save-baseline para crearlo).")
+        return 1 if args.require_baseline else 0
+
+    print(f"\nBaseline: {baseline['created_at']}, {baseline.get('machine', 'máquina desconocida')}, "
+          f"Python {baseline.get('python', '?')}")
+    missing = missing_from_baseline(results, baseline)
+    if missing:
+        print(f"{len(missing)} casos sin referencia en el baseline (no se comparan):")
+        for case in missing:
+            print(f"  - {case}")
+        if args.require_baseline:
+            print("Vuelva a guardar el baseline en la máquina de referencia (--save-baseline).")
+            return 1
+
+    regressions = compare_to_baseline(results, baseline, args.tolerance)
+    if regressions:
+        print(f"\n✗ {len(regressions)} regresiones respecto al baseline ({baseline['created_at']}):")
+        for regression in regressions:
+            print(f"  - {regression}")
+        return 1
+
+    print(f"\n✓ Sin regresiones respecto al baseline ({baseline['created_at']}, tolerancia {args.tolerance:.0%})")
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,45 @@
+import random
+from datetime import datetime, timedelta
+
+# Las fechas se repiten cada 100 años para que series enormes (1M)
+# sigan siendo fechas válidas; hasta ~36.500 registros son únicas.
+DATE_CYCLE_DAYS = 36500
+
+def synthetic_payload(code: str, entries: int, comma_ratio: float = 0.1,
+                      start: datetime = None, seed: int = 42) -> dict:
+    """
+    Genera una respuesta con el formato de mindicador.cl (/api/<code>).
+
+    Args:
+        code (str): Código del indicador.
+        entries (int): Cantidad de registros en 'serie' (más reciente primero).
+        comma_ratio (float): Fracción de valores como string con coma
+                             ("39.623,18"), el otro formato que acepta el transformer.
+        start (datetime): Fecha del registro más reciente (default: hoy).
+        seed (int): Semilla para que las corridas sean comparables.
+    """
+    rng = random.Random(seed)
+    start = start or datetime.now().replace(hour=3, minute=0, second=0, microsecond=0)
+
+    serie = []
+    value = 1000.0
+    for i in range(entries):
+        value = max(1.0, value * (1 + rng.uniform(-0.01, 0.01)))
+        fecha = (start - timedelta(days=i % DATE_CYCLE_DAYS)).strftime('%Y-%m-%dT%H:%M:%S.000Z')
+
+        if rng.random() < comma_ratio:
+            # Ej: 39623.18 -> "39.623,18"
+            valor = f"{value:,.2f}".replace(',', 'X').replace('.', ',').replace('X', '.')
+        else:
+            valor = round(value, 2)
+
+        serie.append({'fecha': fecha, 'valor': valor})
+
+    return {
+        'version': '1.7.0',
+        'autor': 'mindicador.cl',
+        'codigo': code,
+        'nombre': f"Indicador sintético ({code})",
+        'unidad_medida': 'Pesos',
+        'serie': serie
+    }
@@ -1,14 +1,18 @@
+import argparse
 import sys
 import os
+import time
 
 # Añadir el directorio 'app' al path de Python
 sys.path.append(os.path.abspath(os.path.dirname(__file__)))
 
-from app import create_app
+from app import create_app, get_db
+from app.config import Config
 # Importamos las funciones SIMPLES
 from app.services.extractor import fetch_indicator_history
 from app.services.transformer import transform_historical_data
 from app.services.loader import load_data
+from app.services.snapshots import build_snapshots
 from app.utils.logger import setup_logger
 
 logger = setup_logger('etl_job')
@@ -24,69 +28,177 @@ INDICATORS_TO_PROCESS = [
     'bitcoin'
 ]
 
-def run_etl():
+def run_etl(sink=load_data, refresh: bool = True) -> dict:
     """
     Orquesta el proceso completo de ETL:
     Itera sobre cada indicador, extrae su historial,
     lo transforma y lo carga en la DB.
+    
+    Args:
+        sink: Función de carga (recibe los datos limpios y retorna la cantidad
+              de registros cargados, o None si falla). Por defecto load_data;
+              en --dry-run, un MemorySink que no toca la base de datos.
+        refresh (bool): Regenerar los snapshots del dashboard al terminar.
+
+    Returns:
+        dict: Tiempos (segundos) y conteos por indicador y etapa.
+              Ej: {'dolar': {'extract_s': 0.41, 'raw_rows': 9000, ...}, ...}
     """
     logger.info("=============================================")
     logger.info("INICIANDO PROCESO ETL HISTÓRICO...")
     logger.info(f"Se procesarán {len(INDICATORS_TO_PROCESS)} indicadores.")
+    logger.info(f"Modo del extractor: {Config.EXTRACTOR_MODE}")
     logger.info("=============================================")
 
     total_records_loaded = 0
     total_records_failed = 0
+    successful_loads = 0
+    report = {}
 
     # Bucle principal: 1 indicador a la vez
     for indicator_code in INDICATORS_TO_PROCESS:
         
         logger.info(f"--- Procesando: {indicator_code.upper()} ---")
+        stats = report[indicator_code] = {
+            'extract_s': 0.0, 'transform_s': 0.0, 'load_s': 0.0,
+            'raw_rows': 0, 'clean_rows': 0, 'loaded_rows': None
+        }
 
         # Paso 1: Extraer
         # Llama a la función simple
+        started = time.perf_counter()
         raw_data = fetch_indicator_history(indicator_code)
+        stats['extract_s'] = time.perf_counter() - started
         
         if not raw_data:
             logger.error(f"Extracción fallida para '{indicator_code}'. Saltando al siguiente.")
             total_records_failed += 1
             continue
+        stats['raw_rows'] = len(raw_data['serie'])
 
         # Paso 2: Transformar
         # Llama a la función simple
+        started = time.perf_counter()
         clean_data = transform_historical_data(raw_data)
+        stats['transform_s'] = time.perf_counter() - started
         
         if not clean_data:
             logger.error(f"Transformación fallida para '{indicator_code}'. Saltando al siguiente.")
             total_records_failed += 1
             continue
+        stats['clean_rows'] = len(clean_data)
             
         # Paso 3: Cargar
         # El loader.py no necesita cambios, ¡recibirá los datos!
         try:
             # El loader SÍ necesita el contexto de la app
             # (El loader nos dirá cuántos cargó, cuántos omitió)
-            load_data(clean_data)
-            total_records_loaded += len(clean_data) # Esto es aprox, el loader es más exacto
-            logger.info(f"Proceso de carga finalizado para '{indicator_code}'.")
+            started = time.perf_counter()
+            loaded = sink(clean_data)
+            stats['load_s'] = time.perf_counter() - started
+            stats['loaded_rows'] = loaded
+            if loaded is None:
+                logger.error(f"Carga fallida para '{indicator_code}'.")
+                total_records_failed += 1
+            else:
+                successful_loads += 1
+                total_records_loaded += loaded
+                logger.info(f"Proceso de carga finalizado para '{indicator_code}'.")
         except Exception as e:
             logger.error(f"Error crítico durante la fase de carga de '{indicator_code}': {e}", exc_info=True)
             total_records_failed += 1
             
         logger.info(f"--- Fin de {indicator_code.upper()} ---")
 
+    # Paso 4: Regenerar los snapshots precomprimidos del dashboard
+    if refresh and successful_loads > 0:
+        refresh_snapshots()
+
     logger.info("=============================================")
     logger.info("PROCESO ETL HISTÓRICO FINALIZADO.")
     logger.info(f"Total de indicadores procesados con éxito (aprox): {len(INDICATORS_TO_PROCESS) - total_records_failed}")
     logger.info(f"Total de indicadores fallidos: {total_records_failed}")
+    logger.info(f"Total de registros nuevos/actualizados: {total_records_loaded}")
     logger.info("=============================================")
+    log_report(report)
+    return report
+
+def log_report(report: dict):
+    """Tabla de tiempos por etapa y filas por indicador."""
+    logger.info(f"{'indicador':<10} {'extract':>9} {'transform':>10} {'load':>9} "
+                f"{'crudas':>8} {'limpias':>8} {'cargadas':>9}")
+    totals = {'extract_s': 0.0, 'transform_s': 0.0, 'load_s': 0.0, 'raw_rows': 0, 'clean_rows': 0, 'loaded_rows': 0}
+    for code, stats in report.items():
+        loaded = stats['loaded_rows'] if stats['loaded_rows'] is not None else '-'
+        logger.info(f"{code:<10} {stats['extract_s']:>8.3f}s {stats['transform_s']:>9.3f}s {stats['load_s']:>8.3f}s "
+                    f"{stats['raw_rows']:>8} {stats['clean_rows']:>8} {loaded:>9}")
+        for key in totals:
+            totals[key] += stats[key] or 0
+    logger.info(f"{'TOTAL':<10} {totals['extract_s']:>8.3f}s {totals['transform_s']:>9.3f}s {totals['load_s']:>8.3f}s "
+                f"{totals['raw_rows']:>8} {totals['clean_rows']:>8} {totals['loaded_rows']:>9}")
+
+class MemorySink:
+    """
+    Sink en memoria para --dry-run: mismo contrato que load_data
+    (retorna registros nuevos/actualizados), sin base de datos.
+    """
+
+    def __init__(self):
+        self.rows = {}  # (code, date) -> value
+
+    def __call__(self, clean_data: list) -> int:
+        changed = 0
+        for item in clean_data:
+            key = (item['code'], item['date'])
+            if self.rows.get(key) != item['value']:
+                self.rows[key] = item['value']
+                changed += 1
+        return changed
+
+def refresh_snapshots():
+    """Genera los snapshots de la API. Un fallo aquí no invalida la carga."""
+    db = get_db()
+    try:
+        build_snapshots(db)
+    except Exception as e:
+        logger.error(f"Error generando snapshots del dashboard: {e}", exc_info=True)
+    finally:
+        db.close()
 
 # --- Punto de entrada principal ---
 if __name__ == "__main__":
     
-    logger.info("Creando contexto de aplicación Flask para el ETL...")
+    parser = argparse.ArgumentParser(description='Proceso ETL de indicadores económicos (mindicador.cl)')
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument('--record', action='store_true',
+                      help='Guardar las respuestas crudas de la API en el archivo local')
+    mode.add_argument('--replay', action='store_true',
+                      help='Leer las respuestas desde el archivo local, sin red')
+    parser.add_argument('--archive', help=f"Carpeta del archivo de respuestas (default: {Config.ARCHIVE_DIR})")
+    parser.add_argument('--dry-run', action='store_true',
+                        help='Extraer y transformar sin escribir en la base de datos (sink en memoria)')
+    args = parser.parse_args()
     
-    app = create_app()
+    if args.record:
+        Config.EXTRACTOR_MODE = 'record'
+    elif args.replay:
+        Config.EXTRACTOR_MODE = 'replay'
+    if args.archive:
+        Config.ARCHIVE_DIR = args.archive
+    
+    if args.dry_run:
+        # Sin app ni DB: solo extract + transform, con tiempos y conteos
+        logger.info("Dry-run: los datos no se escribirán en la base de datos.")
+        report = run_etl(sink=MemorySink(), refresh=False)
+    else:
+        logger.info("Creando contexto de aplicación Flask para el ETL...")
+        
+        app = create_app()
+        
+        with app.app_context():
+            report = run_etl()
     
-    with app.app_context():
-        run_etl()
\ No newline at end of file
+    # Código de salida distinto de 0 si ningún indicador se cargó (cron, pruebas de carga)
+    if not any(stats['loaded_rows'] is not None for stats in report.values()):
+        logger.error("Ningún indicador se cargó con éxito.")
+        sys.exit(1)
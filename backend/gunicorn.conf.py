@@ -0,0 +1,86 @@
+import multiprocessing
+import os
+
+# Configuración de gunicorn para producción.
+# Uso (desde backend/):  gunicorn -c gunicorn.conf.py
+#
+# Todos los valores se pueden sobreescribir con variables de entorno.
+
+wsgi_app = 'wsgi:app'
+bind = os.environ.get('GUNICORN_BIND', '0.0.0.0:5000')
+
+# --- Modelo de workers ---
+# Presupuesto de conexiones a PostgreSQL para toda la API. Por worker:
+# pool (DB_POOL_SIZE = threads de API) + DB_MAX_OVERFLOW + 1 conexión LISTEN
+# (notifier.py). Default 90: deja margen bajo el max_connections=100 de
+# PostgreSQL para el ETL y conexiones administrativas.
+db_connection_budget = int(os.environ.get('DB_CONNECTION_BUDGET', 90))
+db_max_overflow = int(os.environ.setdefault('DB_MAX_OVERFLOW', '2'))
+
+# gthread: un proceso por núcleo (mínimo 2) y varios threads por proceso,
+# que cubren la espera de PostgreSQL sin sumar procesos (ni pools).
+# Tope: que cada worker tenga al menos 2 threads de API dentro del presupuesto.
+cores = multiprocessing.cpu_count()
+workers = int(os.environ.get(
+    'WEB_CONCURRENCY',
+    max(2, min(cores, db_connection_budget // (2 + db_max_overflow + 1)))
+))
+pool_budget_per_worker = db_connection_budget // workers - db_max_overflow - 1
+
+# Threads para las rutas normales (consultas a la DB): 4 por núcleo
+# repartidos entre los workers, sin pasar del presupuesto de conexiones
+api_threads = int(os.environ.get(
+    'GUNICORN_THREADS',
+    max(1, min(-(-4 * cores // workers), pool_budget_per_worker))
+))
+db_connections = workers * (api_threads + db_max_overflow + 1)
+# Cada dashboard abierto mantiene un /api/stream que ocupa un thread mientras
+# dure. Se suman threads dedicados y la app limita los streams a esa cantidad
+# (STREAM_MAX_CLIENTS, luego 503), así los streams nunca dejan sin threads
+# a /health, /indicators, etc. Un stream esperando en su cola no consume CPU.
+stream_threads = int(os.environ.setdefault('STREAM_MAX_CLIENTS', '50'))
+threads = api_threads + stream_threads
+worker_class = 'gthread'
+
+# Cargar la app en el master antes del fork: arranque más rápido y
+# memoria compartida (copy-on-write) entre workers.
+preload_app = True
+
+# --- Conexiones ---
+keepalive = int(os.environ.get('GUNICORN_KEEPALIVE', 5))
+timeout = int(os.environ.get('GUNICORN_TIMEOUT', 30))
+
+# Reciclar workers cada N peticiones (con jitter para no reiniciarlos todos a la vez)
+max_requests = int(os.environ.get('GUNICORN_MAX_REQUESTS', 1000))
+max_requests_jitter = int(os.environ.get('GUNICORN_MAX_REQUESTS_JITTER', 100))
+
+# Tiempo que un worker tiene para terminar sus peticiones en curso
+# al recibir HUP/TERM (recarga o apagado ordenado).
+graceful_timeout = int(os.environ.get('GUNICORN_GRACEFUL_TIMEOUT', 30))
+
+# --- Entorno de la app ---
+# Config se evalúa al importar la app (después de leer este archivo),
+# así que estos valores por defecto ya aplican con preload_app.
+os.environ.setdefault('FLASK_DEBUG', 'False')
+# Un pool por worker, del tamaño de sus threads de API (los streams no usan el pool)
+os.environ.setdefault('DB_POOL_SIZE', str(api_threads))
+
+accesslog = '-'
+errorlog = '-'
+
+
+def on_starting(server):
+    server.log.info(f"{workers} workers x ({api_threads} threads de API + {stream_threads} de stream); "
+                    f"conexiones a PostgreSQL: {db_connections} de {db_connection_budget}")
+    if db_connections > db_connection_budget:
+        server.log.warning(
+            f"{workers} workers x ({api_threads} pool + {db_max_overflow} overflow + 1 LISTEN) = "
+            f"{db_connections} conexiones, más que DB_CONNECTION_BUDGET={db_connection_budget}: "
+            f"bajar WEB_CONCURRENCY/GUNICORN_THREADS o subir max_connections en PostgreSQL."
+        )
+
+
+def post_fork(server, worker):
+    """Cada worker abre su propio pool en vez de heredar el del master."""
+    from app import dispose_engine
+    dispose_engine()
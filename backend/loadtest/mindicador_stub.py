@@ -0,0 +1,128 @@
+import argparse
+import json
+import os
+import random
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Ejecutar desde backend/:  python -m loadtest.mindicador_stub
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from benchmarks.synthetic import synthetic_payload
+from etl_job import INDICATORS_TO_PROCESS
+
+
+class MindicadorStub:
+    """
+    Servidor local que imita https://mindicador.cl/api/<code>.
+
+    Sirve payloads grabados (<recordings_dir>/<code>.json) o sintéticos,
+    con latencia y tasa de errores configurables.
+    """
+
+    def __init__(self, host: str = '127.0.0.1', port: int = 8099, entries: int = 5000,
+                 latency_ms: float = 0, jitter_ms: float = 0, error_rate: float = 0.0,
+                 recordings_dir: str = None, codes: list = None):
+        self.host = host
+        self.port = port
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.requests_served = 0
+        self.errors_injected = 0
+        self._lock = threading.Lock()
+        self._server = None
+        self._thread = None
+
+        # Payloads serializados una sola vez: el stub no debe ser el cuello de botella
+        self.payloads = {}
+        for code in (codes or INDICATORS_TO_PROCESS):
+            recorded = os.path.join(recordings_dir, f"{code}.json") if recordings_dir else None
+            if recorded and os.path.exists(recorded):
+                with open(recorded, 'rb') as f:
+                    self.payloads[code] = f.read()
+            else:
+                self.payloads[code] = json.dumps(synthetic_payload(code, entries)).encode('utf-8')
+
+    @property
+    def url(self) -> str:
+        """Valor para MINDICADOR_API_URL."""
+        return f"http://{self.host}:{self.port}/api"
+
+    def start(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                stub._handle(self)
+
+            def log_message(self, format, *args):
+                pass  # Sin log por petición
+
+        self._server = ThreadingHTTPServer((self.host, self.port), Handler)
+        self._server.daemon_threads = True
+        self.port = self._server.server_address[1]  # port=0: puerto libre elegido por el sistema
+        self._thread = threading.Thread(target=self._server.serve_forever, name='mindicador-stub', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+
+    def _handle(self, handler):
+        delay_ms = max(0.0, random.gauss(self.latency_ms, self.jitter_ms)) if self.jitter_ms else self.latency_ms
+        if delay_ms:
+            time.sleep(delay_ms / 1000)
+
+        with self._lock:
+            self.requests_served += 1
+            inject_error = random.random() < self.error_rate
+            if inject_error:
+                self.errors_injected += 1
+
+        code = handler.path.rstrip('/').split('/')[-1]
+        if inject_error:
+            self._send(handler, 500, b'{"error": "error simulado"}')
+        elif code in self.payloads:
+            self._send(handler, 200, self.payloads[code])
+        else:
+            self._send(handler, 404, b'{"error": "indicador no encontrado"}')
+
+    def _send(self, handler, status: int, body: bytes):
+        handler.send_response(status)
+        handler.send_header('Content-Type', 'application/json; charset=utf-8')
+        handler.send_header('Content-Length', str(len(body)))
+        handler.end_headers()
+        handler.wfile.write(body)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Stub local de la API de mindicador.cl')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8099)
+    parser.add_argument('--entries', type=int, default=5000, help='Registros por serie sintética')
+    parser.add_argument('--latency-ms', type=float, default=0)
+    parser.add_argument('--jitter-ms', type=float, default=0)
+    parser.add_argument('--error-rate', type=float, default=0.0, help='Fracción de respuestas 500 (0-1)')
+    parser.add_argument('--recordings', help='Carpeta con respuestas grabadas (<code>.json)')
+    args = parser.parse_args()
+
+    stub = MindicadorStub(
+        host=args.host, port=args.port, entries=args.entries,
+        latency_ms=args.latency_ms, jitter_ms=args.jitter_ms,
+        error_rate=args.error_rate, recordings_dir=args.recordings
+    )
+    stub.start()
+    print(f"Stub de mindicador escuchando en {stub.url}  (CTRL+C para detener)")
+    print(f"Uso: MINDICADOR_API_URL={stub.url} python etl_job.py")
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        stub.stop()
+
+if __name__ == '__main__':
+    main()
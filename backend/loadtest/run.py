@@ -0,0 +1,438 @@
+import argparse
+import os
+import random
+import re
+import subprocess
+import sys
+import threading
+import time
+from collections import defaultdict
+
+import requests
+from sqlalchemy.engine import make_url
+
+# Ejecutar desde backend/:  python -m loadtest.run
+BACKEND_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(BACKEND_DIR)
+
+from app.config import DEFAULT_DB_NAME
+from benchmarks.harness import percentile
+from loadtest.mindicador_stub import MindicadorStub
+
+# Botones de período del frontend (index.html)
+PERIODS = (7, 30, 90)
+# Ventana que sincroniza main.js al iniciar (CACHE_DAYS)
+CACHE_DAYS = 365
+
+# Umbrales para declarar saturación
+POOL_SATURATED = 0.9   # conexiones en uso / capacidad del pool (= threads de API)
+STREAMS_SATURATED = 0.9  # streams abiertos / STREAM_MAX_CLIENTS (threads de stream)
+CPU_SATURATED = 0.9    # utilización de CPU del host
+DB_WAITING = 1.0       # sesiones esperando (locks/IO) en promedio
+
+
+class Recorder:
+    """Latencias por endpoint de una etapa de carga."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.samples = defaultdict(list)
+        self.errors = defaultdict(int)
+
+    def record(self, endpoint: str, seconds: float, ok: bool):
+        with self._lock:
+            self.samples[endpoint].append(seconds)
+            if not ok:
+                self.errors[endpoint] += 1
+
+
+class DashboardUser(threading.Thread):
+    """
+    Usuario virtual que imita frontend/js/main.js:
+    /health -> /indicators -> /history (batch, CACHE_DAYS) -> /stream abierto
+    mientras el dashboard sigue abierto (dwell). Los clics de período se
+    resuelven en la caché del navegador; --clicks > 0 simula clics que sí
+    van al backend (caché fría o borrada).
+    """
+
+    def __init__(self, api_url: str, recorder: Recorder, stop_at: float,
+                 clicks: int, think_ms: float, dwell_s: float, seed: int):
+        super().__init__(daemon=True)
+        self.api_url = api_url.rstrip('/')
+        self.recorder = recorder
+        self.stop_at = stop_at
+        self.clicks = clicks
+        self.think_ms = think_ms
+        self.dwell_s = dwell_s
+        self.rng = random.Random(seed)
+        self.http = requests.Session()
+        self.sessions_completed = 0
+
+    def run(self):
+        while time.time() < self.stop_at:
+            try:
+                self._session()
+                self.sessions_completed += 1
+            except requests.RequestException:
+                pass  # Ya quedó registrado como error
+
+    def _get(self, endpoint: str, path: str):
+        start = time.perf_counter()
+        try:
+            response = self.http.get(f"{self.api_url}{path}", timeout=30)
+            ok = response.status_code < 400
+            self.recorder.record(endpoint, time.perf_counter() - start, ok)
+            return response if ok else None
+        except requests.RequestException:
+            self.recorder.record(endpoint, time.perf_counter() - start, False)
+            raise
+
+    def _think(self):
+        if self.think_ms:
+            time.sleep(self.rng.expovariate(1000 / self.think_ms))
+
+    def _session(self):
+        self._get('health', '/health')
+        response = self._get('indicators', '/indicators')
+        if response is None:
+            return
+        codes = [ind['code'] for ind in response.json() if ind.get('latest_value') is not None]
+        if not codes:
+            return
+
+        self._get('history_batch', f"/history?codes={','.join(codes)}&days={CACHE_DAYS}")
+
+        # EventSource: una conexión larga por dashboard (ocupa un thread del worker)
+        stream = self._open_stream()
+        try:
+            closes_at = min(self.stop_at, time.time() + self.dwell_s)
+            for _ in range(self.clicks):
+                if time.time() >= closes_at:
+                    break
+                self._think()
+                code = self.rng.choice(codes)
+                days = self.rng.choice(PERIODS)
+                self._get('history', f"/indicators/{code}/history?days={days}")
+
+            # Dashboard abierto sin hacer nada: solo el stream sigue vivo
+            remaining = closes_at - time.time()
+            if remaining > 0:
+                time.sleep(remaining)
+        finally:
+            if stream is not None:
+                # Como al cerrar la pestaña: el worker libera el cupo recién
+                # al escribir el siguiente heartbeat (STREAM_HEARTBEAT_SECONDS)
+                stream.close()
+
+    def _open_stream(self):
+        """Abrir /stream; se registra el tiempo hasta los headers (503 = worker lleno)."""
+        start = time.perf_counter()
+        try:
+            # Conexión aparte: la sesión HTTP del usuario sigue libre para otras peticiones
+            response = requests.get(f"{self.api_url}/stream", stream=True, timeout=(10, None),
+                                    headers={'Accept': 'text/event-stream'})
+        except requests.RequestException:
+            self.recorder.record('stream', time.perf_counter() - start, False)
+            return None
+
+        ok = response.status_code == 200
+        self.recorder.record('stream', time.perf_counter() - start, ok)
+        if not ok:
+            response.close()
+            return None
+        return response
+
+
+class SaturationSampler(threading.Thread):
+    """
+    Muestrea cada segundo: pool de conexiones (vía /api/ready), CPU del host
+    (/proc/stat, si la API corre en esta máquina) y PostgreSQL (pg_stat_activity).
+    """
+
+    def __init__(self, api_url: str, db_url: str = None):
+        super().__init__(daemon=True)
+        self.api_url = api_url.rstrip('/')
+        self.db_url = db_url
+        self.stop_event = threading.Event()
+        self.pool = []   # fracción del pool en uso (del worker que responde)
+        self.streams = []  # fracción de STREAM_MAX_CLIENTS en uso (mismo worker)
+        self.cpu = []    # utilización 0-1
+        self.db_active = []
+        self.db_waiting = []
+        self.db_connections = []
+        self.db_max_connections = None
+
+    def run(self):
+        http = requests.Session()
+        db = self._connect_db()
+        last_cpu = _read_cpu_times()
+
+        while not self.stop_event.wait(1.0):
+            try:
+                ready = http.get(f"{self.api_url}/ready", timeout=5).json()
+                pool = ready.get('pool')
+                if pool:
+                    capacity = pool['size'] + pool['max_overflow']
+                    self.pool.append(pool['checked_out'] / capacity if capacity else 0)
+                streams = ready.get('streams')
+                if streams and streams['max']:
+                    self.streams.append(streams['connected'] / streams['max'])
+            except (requests.RequestException, ValueError, KeyError):
+                pass
+
+            cpu_times = _read_cpu_times()
+            if cpu_times and last_cpu:
+                busy = cpu_times[0] - last_cpu[0]
+                total = cpu_times[1] - last_cpu[1]
+                if total:
+                    self.cpu.append(busy / total)
+            last_cpu = cpu_times
+
+            if db is not None:
+                self._sample_db(db)
+
+        if db is not None:
+            db.close()
+
+    def _connect_db(self):
+        if not self.db_url:
+            return None
+        import psycopg2
+        conn = psycopg2.connect(self.db_url)
+        conn.autocommit = True
+        with conn.cursor() as cursor:
+            cursor.execute('SHOW max_connections')
+            self.db_max_connections = int(cursor.fetchone()[0])
+        return conn
+
+    def _sample_db(self, conn):
+        with conn.cursor() as cursor:
+            cursor.execute("""
+                SELECT count(*) FILTER (WHERE state = 'active'),
+                       count(*) FILTER (WHERE state = 'active' AND wait_event_type IN ('Lock', 'LWLock', 'IO')),
+                       count(*)
+                FROM pg_stat_activity
+                WHERE datname = current_database() AND pid <> pg_backend_pid()
+            """)
+            active, waiting, connections = cursor.fetchone()
+        self.db_active.append(active)
+        self.db_waiting.append(waiting)
+        self.db_connections.append(connections)
+
+    def summary(self) -> dict:
+        return {
+            'pool_p90': percentile(self.pool, 90) if self.pool else None,
+            'streams_p90': percentile(self.streams, 90) if self.streams else None,
+            'cpu_avg': sum(self.cpu) / len(self.cpu) if self.cpu else None,
+            'db_active_avg': sum(self.db_active) / len(self.db_active) if self.db_active else None,
+            'db_waiting_avg': sum(self.db_waiting) / len(self.db_waiting) if self.db_waiting else None,
+            'db_connections_max': max(self.db_connections) if self.db_connections else None,
+            'db_max_connections': self.db_max_connections
+        }
+
+
+def _read_cpu_times():
+    """(ticks ocupados, ticks totales) del host, o None fuera de Linux."""
+    try:
+        with open('/proc/stat') as f:
+            fields = [int(x) for x in f.readline().split()[1:]]
+    except (OSError, ValueError):
+        return None
+    idle = fields[3] + (fields[4] if len(fields) > 4 else 0)  # idle + iowait
+    return sum(fields) - idle, sum(fields)
+
+def diagnose(saturation: dict, stream_rejected: int = 0) -> list:
+    """Recursos saturados según las muestras de la etapa."""
+    verdict = []
+    if saturation['pool_p90'] is not None and saturation['pool_p90'] >= POOL_SATURATED:
+        verdict.append(f"pool/threads de API (p90 {saturation['pool_p90']:.0%} en uso: subir GUNICORN_THREADS o workers)")
+    if stream_rejected or (saturation['streams_p90'] is not None and saturation['streams_p90'] >= STREAMS_SATURATED):
+        streams = '-' if saturation['streams_p90'] is None else f"{saturation['streams_p90']:.0%}"
+        verdict.append(f"threads de stream (p90 {streams}, {stream_rejected} rechazados con 503: "
+                       f"subir STREAM_MAX_CLIENTS o workers)")
+    if saturation['cpu_avg'] is not None and saturation['cpu_avg'] >= CPU_SATURATED:
+        verdict.append(f"CPU ({saturation['cpu_avg']:.0%}: agregar núcleos/instancias)")
+    if saturation['db_waiting_avg'] is not None and saturation['db_waiting_avg'] >= DB_WAITING:
+        verdict.append(f"DB ({saturation['db_waiting_avg']:.1f} sesiones esperando locks/IO)")
+    if (saturation['db_max_connections'] and saturation['db_connections_max'] is not None
+            and saturation['db_connections_max'] >= 0.9 * saturation['db_max_connections']):
+        verdict.append(f"DB (conexiones {saturation['db_connections_max']}/{saturation['db_max_connections']})")
+    return verdict
+
+
+def etl_database_error(db_url: str):
+    """
+    Motivo para NO ejecutar el ETL del stub sobre `db_url`, o None si se puede.
+    El stub sirve valores sintéticos con los códigos reales: el loader los
+    tomaría como correcciones y pisaría el historial verdadero.
+    """
+    if not db_url:
+        return ("Defina --db-url o LOADTEST_DATABASE_URL (PostgreSQL desechable, la misma "
+                "base de la API bajo prueba), o use --skip-etl.")
+    if make_url(db_url).database == DEFAULT_DB_NAME:
+        return f"--db-url no puede ser la base de datos de la aplicación ({DEFAULT_DB_NAME})."
+    return None
+
+def run_etl(stub: MindicadorStub, db_url: str) -> bool:
+    """Ejecuta el etl_job real contra el stub, sobre la base desechable `db_url`."""
+    url = make_url(db_url)
+    env = dict(
+        os.environ, MINDICADOR_API_URL=stub.url,
+        DB_HOST=url.host or 'localhost', DB_PORT=str(url.port or 5432), DB_NAME=url.database,
+        DB_USER=url.username or '', DB_PASSWORD=url.password or ''
+    )
+    print(f"Ejecutando etl_job.py contra {stub.url} (base {url.database}) ...")
+    start = time.perf_counter()
+    process = subprocess.run(
+        [sys.executable, 'etl_job.py'], cwd=BACKEND_DIR, env=env,
+        capture_output=True, text=True
+    )
+    elapsed = time.perf_counter() - start
+
+    if process.returncode != 0:
+        print(f"✗ El ETL falló (código {process.returncode}):")
+        print(process.stderr[-2000:])
+        return False
+
+    # Con --stub-error-rate algunos indicadores pueden fallar sin que falle el proceso
+    failed = re.search(r'Total de indicadores fallidos: (\d+)', process.stdout + process.stderr)
+    failed = int(failed.group(1)) if failed else 0
+    print(f"{'✓' if not failed else '!'} ETL completado en {elapsed:.1f}s ({stub.requests_served} peticiones "
+          f"al stub, {stub.errors_injected} errores simulados, {failed} indicadores fallidos)")
+    return True
+
+def run_stage(args, users: int) -> dict:
+    recorder = Recorder()
+    sampler = SaturationSampler(args.api, args.db_url)
+    stop_at = time.time() + args.duration
+
+    threads = [
+        DashboardUser(args.api, recorder, stop_at, args.clicks, args.think_ms, args.dwell_s, seed=i)
+        for i in range(users)
+    ]
+    sampler.start()
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    sampler.stop_event.set()
+    sampler.join()
+
+    all_samples = [s for samples in recorder.samples.values() for s in samples]
+    return {
+        'users': users,
+        'elapsed': elapsed,
+        'requests': len(all_samples),
+        'errors': sum(recorder.errors.values()),
+        'stream_rejected': recorder.errors['stream'],
+        'rps': len(all_samples) / elapsed if elapsed else 0,
+        'sessions': sum(t.sessions_completed for t in threads),
+        'p50_ms': percentile(all_samples, 50) * 1000,
+        'p99_ms': percentile(all_samples, 99) * 1000,
+        'endpoints': {
+            endpoint: {
+                'count': len(samples),
+                'errors': recorder.errors[endpoint],
+                'p50_ms': percentile(samples, 50) * 1000,
+                'p95_ms': percentile(samples, 95) * 1000,
+                'p99_ms': percentile(samples, 99) * 1000,
+                'max_ms': max(samples) * 1000
+            }
+            for endpoint, samples in sorted(recorder.samples.items())
+        },
+        'saturation': sampler.summary()
+    }
+
+def print_stage(stage: dict):
+    print(f"\n=== {stage['users']} usuarios: {stage['rps']:.1f} req/s, "
+          f"{stage['sessions']} sesiones, {stage['errors']} errores, "
+          f"p50 {stage['p50_ms']:.1f} ms, p99 {stage['p99_ms']:.1f} ms ===")
+    print(f"{'endpoint':<16} {'count':>8} {'errors':>7} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'max ms':>9}")
+    for endpoint, e in stage['endpoints'].items():
+        print(f"{endpoint:<16} {e['count']:>8} {e['errors']:>7} {e['p50_ms']:>9.1f} "
+              f"{e['p95_ms']:>9.1f} {e['p99_ms']:>9.1f} {e['max_ms']:>9.1f}")
+
+    s = stage['saturation']
+    fmt = lambda v, pattern: '-' if v is None else pattern.format(v)
+    print(f"pool p90: {fmt(s['pool_p90'], '{:.0%}')} | streams p90: {fmt(s['streams_p90'], '{:.0%}')} | CPU: {fmt(s['cpu_avg'], '{:.0%}')} | "
+          f"DB activas: {fmt(s['db_active_avg'], '{:.1f}')} | DB esperando: {fmt(s['db_waiting_avg'], '{:.1f}')} | "
+          f"DB conexiones máx: {fmt(s['db_connections_max'], '{}')}")
+
+def print_summary(stages: list):
+    print("\n=== Resumen ===")
+    print(f"{'usuarios':>8} {'req/s':>9} {'p99 ms':>9} {'saturación'}")
+    previous = None
+    knee = None
+    for stage in stages:
+        verdict = diagnose(stage['saturation'], stage['stream_rejected'])
+        print(f"{stage['users']:>8} {stage['rps']:>9.1f} {stage['p99_ms']:>9.1f} {', '.join(verdict) or '-'}")
+        # Codo: más usuarios ya no dan (casi) más throughput, o hay
+        # dashboards sin stream (su throughput no aparece en req/s)
+        if knee is None and (stage['stream_rejected'] or
+                             (previous and stage['rps'] < previous['rps'] * 1.1)):
+            knee = stage
+        previous = stage
+
+    if knee:
+        print(f"\nEl sistema deja de escalar en ~{knee['users']} usuarios "
+              f"({knee['rps']:.1f} req/s). Cuello de botella: "
+              f"{', '.join(diagnose(knee['saturation'], knee['stream_rejected'])) or 'no identificado (revisar workers/threads de gunicorn)'}")
+    else:
+        print("\nNo se alcanzó la saturación: pruebe con más usuarios (--users).")
+
+def main():
+    parser = argparse.ArgumentParser(description='Prueba de carga del dashboard')
+    parser.add_argument('--api', default='http://localhost:5000/api', help='URL base de la API bajo prueba')
+    parser.add_argument('--users', default='10,25,50,100',
+                        help='Usuarios concurrentes por etapa, separados por coma')
+    parser.add_argument('--duration', type=float, default=30, help='Segundos por etapa')
+    parser.add_argument('--clicks', type=int, default=0,
+                        help='Clics de período por sesión que van al backend (0 = como main.js: '
+                             'los resuelve la caché del navegador)')
+    parser.add_argument('--think-ms', type=float, default=500, help='Pausa media entre clics')
+    parser.add_argument('--dwell-s', type=float, default=20,
+                        help='Segundos que cada dashboard queda abierto (con /stream conectado)')
+    parser.add_argument('--db-url', default=os.environ.get('LOADTEST_DATABASE_URL'),
+                        help='PostgreSQL DESECHABLE de la API bajo prueba: el ETL escribe ahí valores '
+                             'sintéticos; también se muestrea pg_stat_activity (default: LOADTEST_DATABASE_URL)')
+    parser.add_argument('--skip-etl', action='store_true', help='No ejecutar el ETL contra el stub')
+    parser.add_argument('--stub-port', type=int, default=8099)
+    parser.add_argument('--stub-entries', type=int, default=5000)
+    parser.add_argument('--stub-latency-ms', type=float, default=50)
+    parser.add_argument('--stub-jitter-ms', type=float, default=20)
+    parser.add_argument('--stub-error-rate', type=float, default=0.0)
+    parser.add_argument('--recordings', help='Respuestas grabadas para el stub (<code>.json)')
+    args = parser.parse_args()
+
+    if not args.skip_etl:
+        problem = etl_database_error(args.db_url)
+        if problem:
+            print(f"✗ {problem}")
+            return 1
+
+        stub = MindicadorStub(
+            port=args.stub_port, entries=args.stub_entries,
+            latency_ms=args.stub_latency_ms, jitter_ms=args.stub_jitter_ms,
+            error_rate=args.stub_error_rate, recordings_dir=args.recordings
+        )
+        stub.start()
+        try:
+            if not run_etl(stub, args.db_url):
+                return 1
+        finally:
+            stub.stop()
+
+    stages = []
+    for users in [int(u) for u in args.users.split(',')]:
+        print(f"\nEtapa: {users} usuarios durante {args.duration:.0f}s ...")
+        stage = run_stage(args, users)
+        print_stage(stage)
+        stages.append(stage)
+
+    print_summary(stages)
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
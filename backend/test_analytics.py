@@ -0,0 +1,124 @@
+from collections import namedtuple
+from datetime import date
+import numpy as np
+from app.services.analytics import (
+    align, forward_fill, full_period_stats, pct_change, rolling_pairs, rolling_stats
+)
+
+Row = namedtuple('Row', 'indicator_id date value')
+
+def test_forward_fill_mantiene_nan_iniciales():
+    """Cada NaN toma el último valor previo de su columna; los NaN iniciales quedan."""
+    matrix = np.array([
+        [np.nan, 1.0],
+        [2.0, np.nan],
+        [np.nan, np.nan],
+        [4.0, 5.0]
+    ])
+    filled = forward_fill(matrix)
+    expected = np.array([
+        [np.nan, 1.0],
+        [2.0, 1.0],
+        [2.0, 1.0],
+        [4.0, 5.0]
+    ])
+    assert np.array_equal(filled, expected, equal_nan=True)
+
+def test_align_ffill_usa_dias_corridos():
+    """Con ffill el eje tiene todos los días del rango y se arrastran los valores."""
+    rows = [
+        Row(1, date(2025, 6, 6), 900.0),   # viernes
+        Row(1, date(2025, 6, 9), 910.0),   # lunes
+        Row(2, date(2025, 6, 1), 60000.0)  # mensual
+    ]
+    dates, matrix = align(rows, [1, 2], date(2025, 6, 5), date(2025, 6, 9), 'ffill')
+
+    assert dates[0] == date(2025, 6, 5) and len(dates) == 5
+    assert np.isnan(matrix[0, 0])  # antes del primer dato
+    assert list(matrix[1:, 0]) == [900.0, 900.0, 900.0, 910.0]  # sábado y domingo arrastrados
+    # La fila 2025-06-01 queda fuera del eje: sin lookback la columna queda vacía
+    assert np.isnan(matrix[:, 1]).all()
+
+def test_align_none_solo_fechas_con_datos():
+    """Con fill=none el eje son las fechas con algún dato y no se rellena."""
+    rows = [
+        Row(1, date(2025, 6, 9), 910.0),
+        Row(1, date(2025, 6, 6), 900.0),
+        Row(2, date(2025, 6, 9), 1000.0)
+    ]
+    dates, matrix = align(rows, [1, 2], date(2025, 6, 1), date(2025, 6, 30), 'none')
+
+    assert dates == [date(2025, 6, 6), date(2025, 6, 9)]
+    assert np.array_equal(matrix, np.array([[900.0, np.nan], [910.0, 1000.0]]), equal_nan=True)
+
+def test_align_sin_filas():
+    dates, matrix = align([], [1, 2], date(2025, 6, 1), date(2025, 6, 30), 'none')
+    assert dates == [] and matrix.shape == (0, 2)
+
+def test_pct_change():
+    changes = pct_change(np.array([[100.0], [110.0], [0.0], [5.0]]))
+    assert np.isnan(changes[0, 0])
+    assert np.isclose(changes[1, 0], 0.1)
+    assert changes[2, 0] == -1.0
+    assert np.isnan(changes[3, 0])  # división por cero -> NaN
+
+def test_full_period_stats_varianza_cero():
+    """Una serie constante deja su correlación en NaN, sin afectar a las demás."""
+    matrix = np.array([
+        [1.0, 5.0, 2.0],
+        [2.0, 5.0, 4.0],
+        [3.0, 5.0, 6.5],
+        [np.nan, 5.0, 1.0]  # fila incompleta: no se usa
+    ])
+    correlation, covariance, observations = full_period_stats(matrix)
+
+    assert observations == 3
+    assert np.isclose(correlation[0, 2], np.corrcoef(matrix[:3, 0], matrix[:3, 2])[0, 1])
+    assert covariance[1, 1] == 0.0
+    assert np.isnan(correlation[1]).all() and np.isnan(correlation[:, 1]).all()
+
+def test_full_period_stats_menos_de_dos_filas():
+    correlation, covariance, observations = full_period_stats(np.array([[1.0, 2.0]]))
+    assert observations == 1
+    assert np.isnan(correlation).all() and np.isnan(covariance).all()
+
+def test_rolling_stats_menos_filas_que_ventana():
+    correlation, covariance = rolling_stats(np.ones((3, 2)), 5)
+    assert correlation.shape == (0, 2, 2) and covariance.shape == (0, 2, 2)
+
+def test_rolling_stats_igual_a_calculo_directo():
+    """Las sumas acumuladas dan lo mismo que np.cov/np.corrcoef ventana por ventana."""
+    rng = np.random.default_rng(42)
+    matrix = rng.random((60, 3)) * np.array([1.0, 1e3, 1e8])
+    matrix[20, 1] = np.nan
+    window = 10
+    correlation, covariance = rolling_stats(matrix, window)
+
+    assert correlation.shape == (60 - window + 1, 3, 3)
+    for w in (0, 11, 50):
+        rows = matrix[w:w + window]
+        assert np.allclose(covariance[w], np.cov(rows, rowvar=False), equal_nan=True)
+        assert np.allclose(correlation[w], np.corrcoef(rows, rowvar=False), equal_nan=True)
+
+    # Ventanas que incluyen el NaN: solo las celdas de esa columna quedan en NaN
+    assert np.isnan(covariance[15, 1]).all() and np.isnan(covariance[15, :, 1]).all()
+    assert np.isclose(covariance[15, 0, 2], np.cov(matrix[15:25, 0], matrix[15:25, 2])[0, 1])
+
+def test_rolling_stats_varianza_cero():
+    matrix = np.column_stack([np.arange(6.0), np.full(6, 3.0)])
+    correlation, covariance = rolling_stats(matrix, 3)
+    assert np.allclose(covariance[:, 1, 1], 0.0)
+    assert np.isnan(correlation[:, 0, 1]).all()
+    assert np.allclose(correlation[:, 0, 0], 1.0)
+
+def test_rolling_pairs_triangulo_superior():
+    rng = np.random.default_rng(7)
+    matrix = rng.random((20, 3))
+    correlation, covariance = rolling_stats(matrix, 5)
+    result = rolling_pairs(correlation, covariance, ['dolar', 'euro', 'uf'])
+
+    assert result['pairs'] == [['dolar', 'euro'], ['dolar', 'uf'], ['euro', 'uf']]
+    assert len(result['correlation']) == 16 and len(result['correlation'][0]) == 3
+    assert np.isclose(result['correlation'][4][1], correlation[4, 0, 2])
+    assert np.isclose(result['covariance'][4][2], covariance[4, 1, 2])
+    assert np.allclose(result['variance'][4], np.var(matrix[4:9], axis=0, ddof=1))
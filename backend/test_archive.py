@@ -0,0 +1,70 @@
+import gzip
+import json
+import os
+import pytest
+from app.config import Config
+from app.services import extractor
+from app.services.archive import ResponseArchive
+
+BODY = json.dumps({'codigo': 'uf', 'serie': [{'fecha': '2025-11-05T03:00:00.000Z', 'valor': 39623.18}]}).encode()
+
+def objects(base_dir):
+    return [name for _, _, files in os.walk(os.path.join(base_dir, 'objects')) for name in files]
+
+def test_deduplica_por_contenido(tmp_path):
+    archive = ResponseArchive(str(tmp_path))
+    first = archive.save('uf', BODY)
+    assert archive.save('uf', BODY) == first
+    archive.save('dolar', BODY)  # mismo contenido, otro indicador
+
+    assert len(objects(tmp_path)) == 1
+    index = json.loads((tmp_path / 'index.json').read_text())
+    assert [e['sha256'] for e in index['uf']] == [first]
+    assert archive.codes() == ['dolar', 'uf']
+
+def test_load_usa_la_ultima_grabacion(tmp_path):
+    archive = ResponseArchive(str(tmp_path))
+    old = archive.save('uf', BODY)
+    archive.save('uf', b'{"serie": []}')
+
+    # Una instancia nueva (otro proceso) lee el índice desde disco
+    reopened = ResponseArchive(str(tmp_path))
+    assert reopened.load('uf') == b'{"serie": []}'
+    assert reopened.load('uf', old) == BODY
+    assert reopened.load('dolar') is None
+
+def test_objeto_corrupto_o_faltante(tmp_path):
+    archive = ResponseArchive(str(tmp_path))
+    digest = archive.save('uf', BODY)
+    path = archive._object_path(digest)
+
+    with open(path, 'wb') as f:
+        f.write(gzip.compress(BODY.replace(b'39623.18', b'1.00')))
+    assert archive.load('uf') is None
+
+    os.remove(path)
+    assert archive.load('uf') is None
+
+def test_replay_desde_el_archivo(tmp_path, monkeypatch):
+    monkeypatch.setattr(Config, 'ARCHIVE_DIR', str(tmp_path))
+    monkeypatch.setattr(Config, 'EXTRACTOR_MODE', 'replay')
+    ResponseArchive(str(tmp_path)).save('uf', BODY)
+
+    assert extractor.fetch_indicator_history('uf') == json.loads(BODY)
+    assert extractor.fetch_indicator_history('dolar') is None
+
+def test_record_y_replay_dan_lo_mismo(tmp_path, monkeypatch):
+    from loadtest.mindicador_stub import MindicadorStub
+    stub = MindicadorStub(port=0, entries=20, codes=['uf'])
+    stub.start()
+    try:
+        monkeypatch.setattr(Config, 'ARCHIVE_DIR', str(tmp_path))
+        monkeypatch.setattr(extractor, 'MINDICADOR_API_BASE_URL', stub.url + '/')
+        monkeypatch.setattr(Config, 'EXTRACTOR_MODE', 'record')
+        recorded = extractor.fetch_indicator_history('uf')
+    finally:
+        stub.stop()
+
+    monkeypatch.setattr(Config, 'EXTRACTOR_MODE', 'replay')
+    assert extractor.fetch_indicator_history('uf') == recorded
+    assert len(recorded['serie']) == 20
@@ -0,0 +1,31 @@
+import os
+import subprocess
+import sys
+import pytest
+from app.services import extractor
+from loadtest.mindicador_stub import MindicadorStub
+
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+
+@pytest.fixture
+def failing_stub():
+    """Stub de mindicador.cl que responde 500 a todo."""
+    stub = MindicadorStub(port=0, entries=50, error_rate=1.0)
+    stub.start()
+    yield stub
+    stub.stop()
+
+def test_error_http_no_escapa_del_extractor(failing_stub, monkeypatch):
+    monkeypatch.setattr(extractor, 'MINDICADOR_API_BASE_URL', failing_stub.url + '/')
+    assert extractor.fetch_indicator_history('dolar') is None
+    assert failing_stub.errors_injected == 1
+
+def test_etl_sale_con_error_si_todo_falla(failing_stub):
+    env = dict(os.environ, MINDICADOR_API_URL=failing_stub.url)
+    process = subprocess.run(
+        [sys.executable, 'etl_job.py', '--dry-run'], cwd=BACKEND_DIR, env=env,
+        capture_output=True, text=True, timeout=60
+    )
+    assert process.returncode == 1
+    assert 'Traceback' not in process.stderr
+    assert 'Total de indicadores fallidos: 6' in process.stderr
@@ -0,0 +1,63 @@
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from app.models import Base, Indicator, IndicatorValue
+from app.services.payloads import decode_cursor, encode_cursor, history_payload
+
+@pytest.fixture
+def db():
+    """SQLite en memoria con 'uf' y un valor diario durante 200 días."""
+    engine = create_engine('sqlite://')
+    Base.metadata.create_all(engine)
+    session = sessionmaker(bind=engine)()
+    uf = Indicator(id=1, code='uf', name='Unidad de Fomento', unit='Pesos')
+    session.add(uf)
+    today = datetime.now().date()
+    session.add_all(
+        IndicatorValue(indicator_id=1, value=Decimal(30000 + i), date=today - timedelta(days=i))
+        for i in range(200)
+    )
+    session.commit()
+    yield session
+    session.close()
+
+def test_cursor_ida_y_vuelta():
+    since = datetime(2025, 11, 5, 10, 30, 15, 123456)
+    cursor = encode_cursor(2, date(2025, 6, 1), date(2020, 1, 1), date(2025, 6, 30), since)
+    assert decode_cursor(cursor, 2) == (date(2025, 6, 1), date(2020, 1, 1), date(2025, 6, 30), since)
+
+    open_range = encode_cursor(2, date(2025, 6, 1))
+    assert decode_cursor(open_range, 2) == (date(2025, 6, 1), None, None, None)
+
+def test_cursor_de_otro_indicador():
+    with pytest.raises(ValueError, match='otro indicador'):
+        decode_cursor(encode_cursor(1, date(2025, 6, 1)), 2)
+
+@pytest.mark.parametrize('cursor', ['basura', 'eyJpIjoxfQ', '!!!', ''])
+def test_cursor_invalido(cursor):
+    with pytest.raises(ValueError):
+        decode_cursor(cursor or 'e30', 1)
+
+def test_paginas_siguen_el_rango_de_la_primera(db):
+    """Con ?to= y sin from, el cursor recorre todo el historial aunque la petición no repita 'to'."""
+    uf = db.get(Indicator, 1)
+    today = datetime.now().date()
+    first = history_payload(db, uf, limit=80, date_to=today)
+    assert len(first['values']) == 80
+
+    # La página siguiente sin 'to' ni 'from' (days=30 por defecto) no se corta a 30 días
+    second = history_payload(db, uf, limit=80, cursor=first['next_cursor'])
+    third = history_payload(db, uf, limit=80, cursor=second['next_cursor'])
+    dates = [row['date'] for page in (first, second, third) for row in page['values']]
+    assert len(dates) == 200 and len(set(dates)) == 200
+    assert third['next_cursor'] is None
+
+def test_cursor_conserva_rango_explicito(db):
+    uf = db.get(Indicator, 1)
+    today = datetime.now().date()
+    first = history_payload(db, uf, limit=10, date_from=today - timedelta(days=14), date_to=today)
+    # Parámetros distintos en la petición: manda el rango del cursor
+    second = history_payload(db, uf, days=365, limit=10, cursor=first['next_cursor'])
+    assert len(second['values']) == 5 and second['next_cursor'] is None
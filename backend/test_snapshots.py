@@ -0,0 +1,69 @@
+import gzip
+import os
+from datetime import datetime, timedelta
+import pytest
+from flask import Flask
+from app.api.routes import serve_snapshot
+from app.config import Config
+from app.services.snapshots import DiskSnapshotStore, compress, get_snapshot_store
+
+def generations(base_dir):
+    return sorted(name for name in os.listdir(base_dir) if os.path.isdir(os.path.join(base_dir, name)))
+
+def test_sirve_solo_claves_del_manifest(tmp_path):
+    store = DiskSnapshotStore(str(tmp_path))
+    now = datetime.now()
+    store.replace_all({'indicators': compress(b'[1]'), 'stats_latest': compress(b'{}')}, now)
+    assert gzip.decompress(store.get('indicators', 'gzip')) == b'[1]'
+
+    # Nueva corrida sin 'stats_latest': su archivo viejo sigue en disco, pero ya no se sirve
+    store.replace_all({'indicators': compress(b'[2]')}, now + timedelta(microseconds=1))
+    assert gzip.decompress(store.get('indicators', 'gzip')) == b'[2]'
+    assert store.get('stats_latest', 'gzip') is None
+    assert store.get('no_existe', 'gzip') is None
+
+def test_conserva_dos_generaciones(tmp_path):
+    store = DiskSnapshotStore(str(tmp_path))
+    start = datetime.now()
+    stamps = [start + timedelta(microseconds=i) for i in range(4)]
+    for i, generated_at in enumerate(stamps):
+        store.replace_all({'indicators': compress(f'[{i}]'.encode())}, generated_at)
+
+    assert generations(tmp_path) == [s.strftime('%Y%m%dT%H%M%S%f') for s in stamps[-2:]]
+    # Otro worker (otra instancia) lee la generación publicada
+    assert gzip.decompress(DiskSnapshotStore(str(tmp_path)).get('indicators', 'gzip')) == b'[3]'
+
+def test_snapshot_de_otro_dia_no_se_sirve(tmp_path):
+    store = DiskSnapshotStore(str(tmp_path))
+    store.replace_all({'indicators': compress(b'[]')}, datetime.now() - timedelta(days=1))
+    assert store.get('indicators', 'gzip') is None
+
+def test_sin_manifest(tmp_path):
+    assert DiskSnapshotStore(str(tmp_path)).get('indicators', 'gzip') is None
+
+@pytest.fixture
+def app_with_snapshot(tmp_path, monkeypatch):
+    monkeypatch.setattr(Config, 'SNAPSHOT_DIR', str(tmp_path))
+    get_snapshot_store().replace_all({'indicators': compress(b'[]')}, datetime.now())
+    return Flask(__name__)
+
+@pytest.mark.parametrize('accept, expected', [
+    ('gzip', 'gzip'),
+    ('br;q=0, gzip', 'gzip'),
+    ('gzip;q=0', None),
+    ('gzip;q=0, br;q=0', None),
+    ('identity', None),
+    ('', None),
+])
+def test_respeta_q_cero(app_with_snapshot, accept, expected):
+    with app_with_snapshot.test_request_context('/api/indicators', headers={'Accept-Encoding': accept}):
+        response = serve_snapshot('indicators')
+    if expected is None:
+        assert response is None
+    else:
+        assert response.headers['Content-Encoding'] == expected
+
+def test_consistencia_primaria_no_usa_snapshot(app_with_snapshot):
+    with app_with_snapshot.test_request_context('/api/indicators?consistency=primary',
+                                                headers={'Accept-Encoding': 'gzip'}):
+        assert serve_snapshot('indicators') is None
@@ -0,0 +1,43 @@
+import pytest
+from flask import Flask
+from app.api.routes import api_bp
+from app.config import Config
+from app.services.notifier import broadcaster
+
+@pytest.fixture
+def client(monkeypatch):
+    # Sin PostgreSQL: el thread de LISTEN no se levanta
+    monkeypatch.setattr(broadcaster, '_ensure_listener', lambda: None)
+    monkeypatch.setattr(Config, 'STREAM_MAX_CLIENTS', 3)
+    # Solo el blueprint: /stream no usa la base de datos (create_app sí se conecta)
+    app = Flask(__name__)
+    app.register_blueprint(api_bp, url_prefix='/api')
+    yield app.test_client()
+    assert broadcaster.count() == 0
+
+def test_head_no_ocupa_cupo(client):
+    for _ in range(Config.STREAM_MAX_CLIENTS + 1):
+        response = client.head('/api/stream')
+        assert response.status_code == 405
+        assert response.headers['Allow'] == 'GET'
+    assert broadcaster.count() == 0
+
+def test_get_libera_cupo_al_cerrar(client):
+    response = client.get('/api/stream', buffered=False)
+    assert response.status_code == 200
+    assert broadcaster.count() == 1
+    response.close()
+    assert broadcaster.count() == 0
+
+def test_get_sin_leer_cuerpo_libera_cupo(client):
+    """Cerrar la respuesta sin iterar el generador también libera el cupo."""
+    responses = [client.get('/api/stream', buffered=False) for _ in range(Config.STREAM_MAX_CLIENTS)]
+    assert broadcaster.count() == Config.STREAM_MAX_CLIENTS
+
+    busy = client.get('/api/stream')
+    assert busy.status_code == 503 and 'Retry-After' in busy.headers
+
+    for response in responses:
+        response.close()
+    assert broadcaster.count() == 0
+    client.get('/api/stream', buffered=False).close()
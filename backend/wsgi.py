@@ -0,0 +1,6 @@
+from app import create_app
+
+# Punto de entrada WSGI para producción:
+#   gunicorn -c gunicorn.conf.py
+# (run.py queda para desarrollo local con el servidor de Flask)
+app = create_app()
@@ -19,6 +19,7 @@ CREATE TABLE indicator_values (
     value NUMERIC(15, 4) NOT NULL,
     date DATE NOT NULL,
     created_at TIMESTAMP DEFAULT NOW(),
+    updated_at TIMESTAMP NOT NULL DEFAULT NOW(),  -- Última inserción/corrección (sync incremental)
     UNIQUE(indicator_id, date)
 );
 
@@ -26,6 +27,7 @@ CREATE TABLE indicator_values (
 CREATE INDEX idx_indicator_values_date ON indicator_values(date);
 CREATE INDEX idx_indicator_values_indicator_id ON indicator_values(indicator_id);
 CREATE INDEX idx_indicator_values_indicator_date ON indicator_values(indicator_id, date);
+CREATE INDEX idx_indicator_values_indicator_updated ON indicator_values(indicator_id, updated_at);
 
 -- Vista útil: últimos valores de cada indicador
 CREATE VIEW latest_indicators AS
@@ -1,14 +1,18 @@
 // ==================== CONFIGURACIÓN ====================
 const API_BASE_URL = 'http://localhost:5000/api';
+// Espera antes de reintentar /stream si el servidor rechazó la conexión (ej. 503: worker lleno)
+const STREAM_BUSY_RETRY_MS = 30000;
 
 // ==================== FUNCIONES API ====================
 
 /**
  * Obtener todos los indicadores con su último valor
+ * @param {boolean} fresh - Leer del primario (recién cargado por el ETL, las réplicas pueden ir atrasadas)
  */
-async function fetchIndicators() {
+async function fetchIndicators(fresh = false) {
     try {
-        const response = await fetch(`${API_BASE_URL}/indicators`);
+        const query = fresh ? '?consistency=primary' : '';
+        const response = await fetch(`${API_BASE_URL}/indicators${query}`);
         
         if (!response.ok) {
             throw new Error(`HTTP error! status: ${response.status}`);
@@ -26,10 +30,16 @@ async function fetchIndicators() {
  * Obtener histórico de un indicador específico
  * @param {string} code - Código del indicador (ej: 'dolar', 'uf')
  * @param {number} days - Número de días de histórico (default: 30)
+ * @param {string|null} since - 'version' de una respuesta anterior: solo trae los cambios
+ * @param {number|null} limit - Máximo de registros (default de la API: 100)
  */
-async function fetchIndicatorHistory(code, days = 30) {
+async function fetchIndicatorHistory(code, days = 30, since = null, limit = null) {
     try {
-        const response = await fetch(`${API_BASE_URL}/indicators/${code}/history?days=${days}`);
+        const params = new URLSearchParams({ days });
+        if (since) params.set('since', since);
+        if (limit) params.set('limit', limit);
+        
+        const response = await fetch(`${API_BASE_URL}/indicators/${code}/history?${params}`);
         
         if (!response.ok) {
             throw new Error(`HTTP error! status: ${response.status}`);
@@ -43,6 +53,33 @@ async function fetchIndicatorHistory(code, days = 30) {
     }
 }
 
+/**
+ * Obtener el histórico de varios indicadores en una sola petición
+ * @param {Array<string>} codes - Códigos de los indicadores
+ * @param {number} days - Número de días de histórico
+ * @param {string|null} since - 'version' de una respuesta anterior: solo trae los cambios
+ * @param {boolean} fresh - Leer del primario (ver fetchIndicators)
+ */
+async function fetchHistoryBatch(codes, days = 30, since = null, fresh = false) {
+    try {
+        const params = new URLSearchParams({ codes: codes.join(','), days });
+        if (since) params.set('since', since);
+        if (fresh) params.set('consistency', 'primary');
+        
+        const response = await fetch(`${API_BASE_URL}/history?${params}`);
+        
+        if (!response.ok) {
+            throw new Error(`HTTP error! status: ${response.status}`);
+        }
+        
+        const data = await response.json();
+        return { success: true, data };
+    } catch (error) {
+        console.error('Error fetching history batch:', error);
+        return { success: false, error: error.message };
+    }
+}
+
 /**
  * Obtener estadísticas de los últimos valores
  */
@@ -79,4 +116,40 @@ async function checkBackendHealth() {
         console.error('Backend health check failed:', error);
         return { success: false, error: error.message };
     }
-}
\ No newline at end of file
+}
+
+/**
+ * Suscribirse a los valores nuevos que publica el backend (Server-Sent Events)
+ * @param {Object} handlers - { onValue(event), onResync(codes) }
+ * @returns {EventSource|null} La conexión (se reconecta sola, también tras un 503)
+ */
+function subscribeToUpdates(handlers) {
+    if (!window.EventSource) {
+        console.warn('EventSource no disponible: sin actualizaciones en vivo');
+        return null;
+    }
+    
+    const source = new EventSource(`${API_BASE_URL}/stream`);
+    
+    source.addEventListener('value', (e) => {
+        handlers.onValue(JSON.parse(e.data));
+    });
+    
+    source.addEventListener('resync', (e) => {
+        handlers.onResync(JSON.parse(e.data).codes);
+    });
+    
+    source.onerror = () => {
+        if (source.readyState === EventSource.CLOSED) {
+            // Respuesta no-SSE (ej. 503 por límite de streams): EventSource no
+            // reintenta solo. Reintentar con jitter para no volver todos a la vez.
+            const delay = STREAM_BUSY_RETRY_MS * (0.5 + Math.random());
+            console.warn(`Actualizaciones en vivo no disponibles. Reintentando en ${Math.round(delay / 1000)}s...`);
+            setTimeout(() => subscribeToUpdates(handlers), delay);
+            return;
+        }
+        console.warn('Conexión de actualizaciones en vivo interrumpida. Reintentando...');
+    };
+    
+    return source;
+}
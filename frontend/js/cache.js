@@ -0,0 +1,108 @@
+// ==================== CACHÉ LOCAL (IndexedDB) ====================
+
+const CACHE_DB_NAME = 'indicadores-cache';
+const CACHE_DB_VERSION = 1;
+const SERIES_STORE = 'series';
+
+let cacheDbPromise = null;
+
+/**
+ * Abrir (o crear) la base IndexedDB del caché de series
+ */
+function openSeriesCache() {
+    if (cacheDbPromise) {
+        return cacheDbPromise;
+    }
+
+    cacheDbPromise = new Promise((resolve, reject) => {
+        if (!window.indexedDB) {
+            reject(new Error('IndexedDB no disponible'));
+            return;
+        }
+
+        const request = indexedDB.open(CACHE_DB_NAME, CACHE_DB_VERSION);
+
+        request.onupgradeneeded = () => {
+            request.result.createObjectStore(SERIES_STORE, { keyPath: 'code' });
+        };
+        request.onsuccess = () => resolve(request.result);
+        request.onerror = () => reject(request.error);
+    });
+
+    return cacheDbPromise;
+}
+
+/**
+ * Obtener una serie cacheada
+ * @param {string} code - Código del indicador
+ * @returns {Object|null} { code, indicator, values, version } o null si no existe
+ */
+async function getCachedSeries(code) {
+    try {
+        const db = await openSeriesCache();
+        return await new Promise((resolve, reject) => {
+            const request = db.transaction(SERIES_STORE, 'readonly')
+                .objectStore(SERIES_STORE)
+                .get(code);
+            request.onsuccess = () => resolve(request.result || null);
+            request.onerror = () => reject(request.error);
+        });
+    } catch (error) {
+        console.warn(`Caché no disponible para ${code}:`, error);
+        return null;
+    }
+}
+
+/**
+ * Guardar una serie en el caché
+ * @param {Object} series - { code, indicator, values, version }
+ */
+async function putCachedSeries(series) {
+    try {
+        const db = await openSeriesCache();
+        await new Promise((resolve, reject) => {
+            const tx = db.transaction(SERIES_STORE, 'readwrite');
+            tx.objectStore(SERIES_STORE).put(series);
+            tx.oncomplete = () => resolve();
+            tx.onerror = () => reject(tx.error);
+        });
+    } catch (error) {
+        console.warn(`No se pudo guardar ${series.code} en caché:`, error);
+    }
+}
+
+/**
+ * Mezclar un delta en una serie cacheada.
+ * Los valores del delta reemplazan a los de la misma fecha; el resultado
+ * queda ordenado de más reciente a más antiguo (igual que la API) y
+ * recortado a los últimos `days` días.
+ * @returns {Object} Serie resultante
+ */
+function mergeSeriesDelta(cached, delta, days) {
+    const byDate = new Map();
+
+    if (cached) {
+        cached.values.forEach(v => byDate.set(v.date, v));
+    }
+    delta.values.forEach(v => byDate.set(v.date, v));
+
+    const values = filterByPeriod(Array.from(byDate.values()), days)
+        .sort((a, b) => (a.date < b.date ? 1 : -1));
+
+    return {
+        code: delta.indicator.code,
+        indicator: delta.indicator,
+        values,
+        version: delta.version || (cached ? cached.version : null)
+    };
+}
+
+/**
+ * Valores de los últimos `days` días (mismo criterio que ?days= en la API)
+ */
+function filterByPeriod(values, days) {
+    const minDate = new Date();
+    minDate.setDate(minDate.getDate() - days);
+    const minDateIso = minDate.toISOString().slice(0, 10);
+    return values.filter(v => v.date >= minDateIso);
+}
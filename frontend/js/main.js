@@ -3,6 +3,12 @@ let allIndicators = [];
 let currentIndicator = null;
 let currentDays = 30; // Default 30 días
 
+// Caché de series: se sincroniza una vez por sesión (con deltas ?since=)
+// y luego los cambios de período/indicador se resuelven localmente.
+const CACHE_DAYS = 365;   // Ventana cacheada (cubre todos los botones de período)
+const CACHE_LIMIT = 1000; // Sin truncar la ventana en la primera descarga
+const seriesCache = new Map();
+
 // ==================== INICIALIZACIÓN ====================
 
 document.addEventListener('DOMContentLoaded', async () => {
@@ -17,6 +23,12 @@ document.addEventListener('DOMContentLoaded', async () => {
     await loadInitialData();
     setupEventListeners();
     
+    // Actualizaciones en vivo: el backend avisa cuando el ETL carga valores
+    subscribeToUpdates({
+        onValue: handleLiveValue,
+        onResync: handleResync
+    });
+    
     console.log('✅ Aplicación iniciada correctamente');
 });
 
@@ -38,10 +50,15 @@ async function loadInitialData() {
         hideLoading();
         showContent();
         
+        // Sincronizar todas las series con una sola petición
+        const codesWithData = allIndicators
+            .filter(ind => ind.latest_value !== null)
+            .map(ind => ind.code);
+        await syncAllSeries(codesWithData);
+        
         // Auto-cargar el primer indicador con datos
-        const firstIndicator = allIndicators.find(ind => ind.latest_value !== null);
-        if (firstIndicator) {
-            loadIndicatorChart(firstIndicator.code);
+        if (codesWithData.length > 0) {
+            loadIndicatorChart(codesWithData[0]);
         }
         
     } catch (error) {
@@ -89,6 +106,18 @@ function renderStatsCards(indicators) {
     });
 }
 
+function updateStatCard(indicator) {
+    const oldCard = document.querySelector(`.stat-card[data-code="${indicator.code}"]`);
+    const card = createStatCard(indicator);
+    
+    if (oldCard) {
+        card.classList.toggle('active', oldCard.classList.contains('active'));
+        oldCard.replaceWith(card);
+    } else {
+        document.getElementById('stats-cards').appendChild(card);
+    }
+}
+
 function createStatCard(indicator) {
     const card = document.createElement('div');
     card.className = 'stat-card';
@@ -132,47 +161,20 @@ async function loadIndicatorChart(code) {
         document.getElementById('chart-title').textContent = `🪙​ ​​${indicator.name} 🪙​`;
     }
     
-    // Mostrar loading en el gráfico
+    // Mostrar loading en el gráfico (solo si hay que ir al backend)
     const chartContainer = document.querySelector('.chart-container');
-    chartContainer.innerHTML = `
-        <div style="display: flex; justify-content: center; align-items: center; height: 400px;">
-            <div class="spinner"></div>
-        </div>
-    `;
+    if (!seriesCache.has(code)) {
+        chartContainer.innerHTML = `
+            <div style="display: flex; justify-content: center; align-items: center; height: 400px;">
+                <div class="spinner"></div>
+            </div>
+        `;
+    }
     
     try {
-        const response = await fetchIndicatorHistory(code, currentDays);
-        
-        if (!response.success) {
-            throw new Error(response.error);
-        }
-        
-        const historyData = response.data;
-        
-        if (!historyData.values || historyData.values.length === 0) {
-            chartContainer.innerHTML = `
-                <div class="chart-placeholder">
-                    <p class="chart-placeholder-icon">📊</p>
-                    <p class="chart-placeholder-text">Sin datos históricos disponibles</p>
-                </div>
-            `;
-            return;
-        }
-        
-        const labels = historyData.values.map(v => {
-            const date = new Date(v.date);
-            return date.toLocaleDateString('es-CL', { 
-                day: '2-digit', 
-                month: 'short' 
-            });
-        });
-        
-        const data = historyData.values.map(v => v.value);
-        
-        chartContainer.innerHTML = '<canvas id="main-chart"></canvas>';
-        createOrUpdateChart(labels, data, historyData.indicator.name);
-        
+        const series = await getSeries(code);
         currentIndicator = code;
+        renderChart(series);
         
     } catch (error) {
         console.error('Error loading chart:', error);
@@ -185,6 +187,160 @@ async function loadIndicatorChart(code) {
     }
 }
 
+/**
+ * Dibujar una serie cacheada, filtrada al período seleccionado
+ */
+function renderChart(series) {
+    const chartContainer = document.querySelector('.chart-container');
+    const values = filterByPeriod(series.values, currentDays);
+    
+    if (values.length === 0) {
+        chartContainer.innerHTML = `
+            <div class="chart-placeholder">
+                <p class="chart-placeholder-icon">📊</p>
+                <p class="chart-placeholder-text">Sin datos históricos disponibles</p>
+            </div>
+        `;
+        return;
+    }
+    
+    const labels = values.map(v => {
+        const date = new Date(v.date);
+        return date.toLocaleDateString('es-CL', { 
+            day: '2-digit', 
+            month: 'short' 
+        });
+    });
+    
+    const data = values.map(v => v.value);
+    
+    chartContainer.innerHTML = '<canvas id="main-chart"></canvas>';
+    createOrUpdateChart(labels, data, series.indicator.name);
+}
+
+// ==================== SERIES CACHE ====================
+
+/**
+ * Obtener la serie de un indicador: desde memoria si ya se sincronizó
+ * en esta sesión; si no, desde IndexedDB + delta del backend.
+ */
+async function getSeries(code) {
+    if (seriesCache.has(code)) {
+        return seriesCache.get(code);
+    }
+    
+    const cached = await getCachedSeries(code);
+    const response = await fetchIndicatorHistory(
+        code, CACHE_DAYS, cached ? cached.version : null, CACHE_LIMIT
+    );
+    
+    if (!response.success) {
+        // Sin conexión: mostrar lo que haya en caché
+        if (cached) {
+            return cached;
+        }
+        throw new Error(response.error);
+    }
+    
+    const series = mergeSeriesDelta(cached, response.data, CACHE_DAYS);
+    seriesCache.set(code, series);
+    await putCachedSeries(series);
+    return series;
+}
+
+/**
+ * Sincronizar varias series con una sola petición a /history.
+ * Si todas están en IndexedDB, solo se piden los cambios desde
+ * la versión más antigua.
+ * @param {boolean} fresh - Leer del primario (tras un aviso de carga del ETL)
+ */
+async function syncAllSeries(codes, fresh = false) {
+    if (codes.length === 0) {
+        return;
+    }
+    
+    const cached = await Promise.all(codes.map(code => getCachedSeries(code)));
+    const since = cached.every(s => s && s.version)
+        ? cached.map(s => s.version).sort()[0]
+        : null;
+    
+    const response = await fetchHistoryBatch(codes, CACHE_DAYS, since, fresh);
+    if (!response.success) {
+        return; // getSeries() reintentará indicador por indicador
+    }
+    
+    await Promise.all(codes.map(async (code, i) => {
+        const delta = response.data.series[code];
+        if (!delta) {
+            return;
+        }
+        const series = mergeSeriesDelta(cached[i], delta, CACHE_DAYS);
+        seriesCache.set(code, series);
+        await putCachedSeries(series);
+    }));
+}
+
+// ==================== LIVE UPDATES ====================
+
+/**
+ * Aplicar un valor nuevo recibido por /api/stream
+ * @param {Object} event - { code, date, value }
+ */
+async function handleLiveValue(event) {
+    // 1. Card: solo si el valor es igual o más reciente que el mostrado
+    const indicator = allIndicators.find(ind => ind.code === event.code);
+    if (indicator && (!indicator.latest_date || event.date >= indicator.latest_date)) {
+        indicator.latest_value = event.value;
+        indicator.latest_date = event.date;
+        updateStatCard(indicator);
+        updateLastUpdateTime();
+    }
+    
+    // 2. Serie cacheada (y gráfico, si es el indicador visible)
+    const cached = seriesCache.get(event.code);
+    if (!cached) {
+        return; // Se sincronizará con ?since= cuando se abra
+    }
+    
+    const series = mergeSeriesDelta(cached, {
+        indicator: cached.indicator,
+        values: [{ date: event.date, value: event.value }],
+        version: null // Se conserva la versión del caché: el próximo delta lo confirma
+    }, CACHE_DAYS);
+    seriesCache.set(event.code, series);
+    await putCachedSeries(series);
+    
+    if (event.code === currentIndicator) {
+        renderChart(series);
+    }
+}
+
+/**
+ * Carga masiva en el backend: pedir los deltas en vez de recibir fila a fila
+ * @param {Array<string>} codes - Indicadores afectados
+ */
+async function handleResync(codes) {
+    console.log('🔄 Resincronizando:', codes.join(', '));
+    
+    // Recién cargado por el ETL: leer del primario (read-your-writes)
+    const response = await fetchIndicators(true);
+    if (response.success) {
+        allIndicators = response.data;
+        renderStatsCards(allIndicators);
+        updateLastUpdateTime();
+    }
+    
+    const cachedCodes = codes.filter(code => seriesCache.has(code));
+    cachedCodes.forEach(code => seriesCache.delete(code));
+    
+    // syncAllSeries parte desde IndexedDB, así que solo trae los cambios
+    await syncAllSeries(cachedCodes, true);
+    
+    if (currentIndicator) {
+        loadIndicatorChart(currentIndicator);
+    }
+}
+
 // ==================== EVENT LISTENERS ====================
 
 function setupEventListeners() {